@@ -1,5 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .cache import get_shared_versions
 
 
 class EmailBackend(ModelBackend):
@@ -13,3 +18,57 @@ class EmailBackend(ModelBackend):
             if user.get_email_field_name == email:
                 return user
         return user.email_user()
+
+
+def claims_version(user_id):
+    '''
+    Имя счётчика версии ролевых claims пользователя. Любое сохранение
+    или удаление пользователя увеличивает его, и выданные раньше
+    токены перестают подменять чтение пользователя из базы.
+    '''
+    return f'users.user:{user_id}:claims'
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+
+    '''
+    JWT без запроса к таблице пользователей: если версия claims
+    в токене актуальна, пользователь собирается из `username`, `role`
+    и `is_superuser` токена. Остальные поля отложены и загружаются
+    из базы только при обращении к ним. Токены без claims или
+    с устаревшей версией проверяются как обычно, по базе — как и все
+    токены, если счётчики версий не общие для процессов сервера.
+    '''
+
+    claim_fields = ('username', 'role', 'is_superuser')
+    version_claim = 'claims_version'
+
+    def get_user(self, validated_token):
+        user = self.get_claims_user(validated_token)
+        if user is None:
+            return super().get_user(validated_token)
+        return user
+
+    def get_claims_user(self, validated_token):
+        claims = (jwt_settings.USER_ID_CLAIM, self.version_claim,
+                  *self.claim_fields)
+        if any(claim not in validated_token for claim in claims):
+            return None
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        versions = get_shared_versions(claims_version(user_id))
+        if versions is None or validated_token[self.version_claim] != (
+                versions[0]):
+            return None
+        UserModel = get_user_model()
+        values = {
+            UserModel._meta.get_field(jwt_settings.USER_ID_FIELD).attname:
+                user_id,
+            **{name: validated_token[name] for name in self.claim_fields},
+        }
+        return UserModel.from_db(
+            router.db_for_read(UserModel),
+            list(values),
+            [values[field.attname]
+             for field in UserModel._meta.concrete_fields
+             if field.attname in values],
+        )
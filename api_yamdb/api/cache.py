@@ -0,0 +1,123 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models, transaction
+
+from reviews.models import Comment, Review, Title
+
+VERSION_KEY_PREFIX = 'version'
+
+# Версия рейтингов всех произведений: меняется при записи отзывов.
+TITLE_RATINGS_VERSION = 'reviews.title:ratings'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_name(item):
+    '''
+    Имя счётчика версии: модель превращается в её метку, объект —
+    в метку модели с первичным ключом, строки используются как есть.
+    '''
+    if isinstance(item, str):
+        return item
+    if isinstance(item, models.Model):
+        return f'{item._meta.label_lower}:{item.pk}'
+    return item._meta.label_lower
+
+
+def _initial_version():
+    # Новый счётчик начинается с текущего времени в микросекундах,
+    # чтобы после вытеснения из кеша не совпасть с прежними значениями.
+    return int(time.time() * 1000000)
+
+
+def get_versions(*items):
+    cache = get_cache()
+    keys = [f'{VERSION_KEY_PREFIX}:{version_name(item)}' for item in items]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def versions_shared():
+    '''
+    Видят ли все процессы сервера одни и те же счётчики версий.
+    Сброс версии в LocMemCache виден только своему процессу,
+    DummyCache версий не хранит вовсе.
+    '''
+    cache = get_cache()
+    if isinstance(cache, DummyCache):
+        return False
+    if isinstance(cache, LocMemCache):
+        return settings.API_CACHE_SINGLE_PROCESS
+    return True
+
+
+def get_shared_versions(*items):
+    '''
+    Версии для ETag, ключей кеша и claims токена либо None, если
+    на счётчики нельзя опереться: они не общие для процессов или
+    какой-то из них не сохранился.
+    '''
+    if not versions_shared():
+        return None
+    versions = get_versions(*items)
+    if None in versions:
+        return None
+    return versions
+
+
+def bump_versions(*items):
+    cache = get_cache()
+    for item in items:
+        key = f'{VERSION_KEY_PREFIX}:{version_name(item)}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), None)
+
+
+def bump_versions_on_commit(*items):
+    '''
+    Увеличивает версии после фиксации текущей транзакции: до неё
+    другие запросы ещё видят старые данные.
+    '''
+    transaction.on_commit(lambda: bump_versions(*items))
+
+
+def parent_versions(instance):
+    '''
+    Версии, ответы по которым зависят от объекта, но которых нет
+    в журнале изменений: рейтинг и отзывы произведения, комментарии
+    отзыва.
+    '''
+    if isinstance(instance, Review):
+        return (Title(pk=instance.title_id), TITLE_RATINGS_VERSION)
+    if isinstance(instance, Comment):
+        return (Review(pk=instance.review_id),)
+    return ()
+
+
+def make_signature(versions, params=()):
+    '''
+    Хеш версий данных и параметров запроса, не зависящий от порядка
+    параметров.
+    '''
+    signature = repr((
+        list(versions),
+        sorted((name, sorted(values)) for name, values in params)
+    ))
+    return hashlib.sha1(signature.encode()).hexdigest()
+
+
+def make_key(prefix, versions, params=()):
+    return f'{prefix}:{make_signature(versions, params)}'
@@ -1,7 +1,67 @@
 import django_filters as filters
+from django.db import connection
+from django.db.models import F, FloatField, Func, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
 
 from reviews.models import Title
 
+TITLE_SEARCH_TABLE = 'reviews_title_search'
+
+_search_index = {}
+
+
+def title_search_available():
+    '''
+    Есть ли в текущей базе полнотекстовый индекс произведений.
+    Результат проверки запоминается для каждой базы.
+    '''
+    name = connection.settings_dict['NAME']
+    if name not in _search_index:
+        _search_index[name] = (
+            connection.vendor == 'sqlite'
+            and TITLE_SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _search_index[name]
+
+
+class TitleSearchRank(Func):
+
+    '''
+    Ранг совпадения произведения в полнотекстовом индексе.
+    Ключ произведения подставляется выражением, поэтому ранг
+    корректен и внутри подзапроса с другими псевдонимами таблиц.
+    '''
+
+    template = (
+        f'(SELECT rank FROM {TITLE_SEARCH_TABLE} '
+        f'WHERE {TITLE_SEARCH_TABLE} MATCH %(expressions)s)'
+    )
+    arg_joiner = ' AND rowid = '
+    output_field = FloatField()
+
+    def __init__(self, query):
+        super().__init__(Value(query), F('pk'))
+
+
+class TitleSearchMatches(RawSQL):
+
+    '''
+    Ключи произведений, найденных в полнотекстовом индексе.
+    Скобки вокруг подзапроса добавляет сам lookup `__in`: двойные
+    скобки SQLite считает скалярным подзапросом с одной строкой.
+    '''
+
+    def __init__(self, query):
+        super().__init__(
+            f'SELECT rowid FROM {TITLE_SEARCH_TABLE} '
+            f'WHERE {TITLE_SEARCH_TABLE} MATCH %s',
+            [query],
+        )
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
 
 class TitleFilter(filters.FilterSet):
     name = filters.CharFilter(
@@ -17,3 +77,23 @@ class TitleFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = ['name', 'category', 'genre', 'year']
+
+
+class TitleSearchFilter(SearchFilter):
+
+    '''
+    Ранжированный поиск по полнотекстовому индексу произведений.
+    Если индекса нет (база не SQLite или без FTS5) — обычный
+    поиск DRF по `search_fields`.
+    '''
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not title_search_available():
+            return super().filter_queryset(request, queryset, view)
+        query = ' '.join(
+            '"{}"*'.format(term.replace('"', '""')) for term in terms
+        )
+        return queryset.filter(pk__in=TitleSearchMatches(query)).annotate(
+            search_rank=TitleSearchRank(query)
+        ).order_by('search_rank', 'id')
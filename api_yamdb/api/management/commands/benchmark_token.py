@@ -0,0 +1,70 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from api.views import Custom_TokenObtainPairView
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Measure /api/v1/auth/token/ throughput for valid codes and '
+            'unknown usernames. Runs in a rolled back transaction.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, requests: int, **options):
+        # Лимиты запросов отключены: измеряется сам обмен кода на токен.
+        self.view = Custom_TokenObtainPairView.as_view(throttle_classes=())
+        self.factory = APIRequestFactory()
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    username='benchmark_token', email='benchmark@yamdb.fake'
+                )
+                self.report('valid code', requests, self.valid, user)
+                self.report('unknown username', requests, self.unknown, user)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def valid(self, user, i):
+        code = user.make_confirmation_code()
+        user.set_confirmation_code(code)
+        User.objects.filter(pk=user.pk).update(
+            confirmation_code=user.confirmation_code
+        )
+        start = time.perf_counter()
+        response = self.post(user.username, code)
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200, response.data
+        return elapsed
+
+    def unknown(self, user, i):
+        start = time.perf_counter()
+        response = self.post(f'unknown_{i % 10}', 'code')
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 404, response.data
+        return elapsed
+
+    def post(self, username, code):
+        request = self.factory.post(
+            '/api/v1/auth/token/',
+            {'username': username, 'confirmation_code': code},
+        )
+        return self.view(request)
+
+    def report(self, name, requests, scenario, user):
+        total = sum(scenario(user, i) for i in range(requests))
+        self.stdout.write(
+            f'{name}: {requests / total:.0f} tokens/sec '
+            f'({total / requests * 1000:.2f} ms per request)'
+        )
@@ -1,8 +1,291 @@
-from rest_framework import viewsets
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, models, router, transaction
+from django.utils.http import parse_etags
+from rest_framework import exceptions, permissions, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from reviews.models import ChangeLog
+from .cache import (get_cache, get_shared_versions, make_key,
+                    make_signature, version_name)
+from .pagination import KeysetPagination
+from .permissions import AdminOnly
+
+User = get_user_model()
 
 
 class ListOrCreateOrDestroy(ListModelMixin, CreateModelMixin,
                             DestroyModelMixin, viewsets.GenericViewSet):
     pass
+
+
+class KeysetPaginationMixin:
+
+    '''
+    Переключает список на постраничный вывод по курсору, если клиент
+    передал `?pagination=cursor` или сам курсор.
+    '''
+
+    keyset_ordering = ('id',)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and (
+                KeysetPagination.is_requested(self.request)):
+            self._paginator = KeysetPagination(self.keyset_ordering)
+        return super().paginator
+
+
+class AtomicWriteMixin:
+
+    '''
+    Запись через вьюсет идёт в одной транзакции с журналом изменений.
+    Версии закешированных ответов увеличивают сигналы моделей и журнала
+    (`api.signals`) после фиксации транзакции.
+    '''
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
+
+class CachedListMixin:
+
+    '''
+    Отдаёт список из кеша. Ключ строится из версии модели и параметров
+    запроса, поэтому любая запись в журнал изменений сразу делает
+    старые ответы недоступными. Без общих счётчиков версий список
+    не кешируется.
+    '''
+
+    def list(self, request, *args, **kwargs):
+        model = self.queryset.model
+        versions = get_shared_versions(model)
+        if versions is None:
+            return super().list(request, *args, **kwargs)
+        key = make_key(
+            f'list:{version_name(model)}:{request.get_host()}',
+            versions, request.query_params.lists()
+        )
+        data = get_cache().get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        get_cache().set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin:
+
+    '''
+    Строгий ETag для `list` и `retrieve`, построенный из версий данных,
+    а не из тела ответа: на совпавший `If-None-Match` вьюсет отвечает
+    304 до выборки объектов и работы сериализаторов. Без общих
+    счётчиков версий ETag не выдаётся.
+    '''
+
+    def get_etag_versions(self):
+        raise NotImplementedError
+
+    def get_etag(self, request):
+        versions = get_shared_versions(*self.get_etag_versions())
+        if versions is None:
+            return None
+        return '"{}"'.format(make_signature(versions, [
+            ('path', [request.get_full_path()]),
+            ('accept', [request.META.get('HTTP_ACCEPT', '')]),
+        ]))
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class SparseFieldsMixin:
+
+    '''
+    `?fields=a,b` при чтении: в ответе остаются только перечисленные
+    поля сериализатора, а `get_queryset` по `get_sparse_fields()`
+    может не загружать лишние столбцы и связи.
+    '''
+
+    fields_query_param = 'fields'
+
+    def get_sparse_fields(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(self.fields_query_param)
+        if not value:
+            return None
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.get_sparse_fields()
+        if requested is None:
+            return serializer
+        fields = getattr(serializer, 'child', serializer).fields
+        unknown = requested - set(fields)
+        if unknown:
+            raise exceptions.ValidationError({
+                self.fields_query_param: [
+                    f'Unknown fields: {", ".join(sorted(unknown))}.'
+                ]
+            })
+        for name in set(fields) - requested:
+            fields.pop(name)
+        return serializer
+
+
+def assign_bulk_pks(model, instances):
+    '''
+    Проставляет ключи объектам после `bulk_create`, если база их
+    не вернула (SQLite). Вызывать в той же транзакции: запись в SQLite
+    идёт под блокировкой, поэтому последние ключи таблицы — наши.
+    В других базах без возврата ключей это не так: там ошибка.
+    '''
+    if not instances or instances[0].pk is not None:
+        return
+    vendor = connections[router.db_for_write(model)].vendor
+    if vendor != 'sqlite':
+        raise NotImplementedError(
+            f'Cannot assign primary keys after bulk_create on {vendor}.'
+        )
+    pks = model.objects.order_by('-pk').values_list(
+        'pk', flat=True)[:len(instances)]
+    for instance, pk in zip(instances, reversed(pks)):
+        instance.pk = pk
+
+
+def check_bulk_payload(items, max_items):
+    if not isinstance(items, list) or not items:
+        raise exceptions.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Expected a non-empty list of items.'
+            ]
+        })
+    if len(items) > max_items:
+        raise exceptions.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Ensure there are no more than {max_items} items.'
+            ]
+        })
+
+
+class BulkCreateMixin:
+
+    '''
+    `POST .../bulk/` принимает список объектов, проверяет каждый
+    сериализатором вьюсета и сохраняет все корректные одним
+    `bulk_create` в транзакции. Автор по умолчанию — текущий
+    пользователь, администратор может указать `author` (username).
+    В ответе — результат для каждого элемента в исходном порядке.
+    '''
+
+    bulk_max_items = 1000
+
+    def build_bulk_instance(self, validated_data):
+        raise NotImplementedError
+
+    def check_bulk_instances(self, instances):
+        '''
+        Проверки, требующие всего набора сразу.
+        Возвращает ошибки по позициям в `instances`.
+        '''
+        return {}
+
+    def perform_bulk_create(self, instances):
+        model = type(instances[0])
+        model.objects.bulk_create(instances)
+        assign_bulk_pks(model, instances)
+        ChangeLog.objects.log(
+            model, [instance.pk for instance in instances], ChangeLog.CREATE,
+            instances
+        )
+
+    def validate_bulk_item(self, item, authors):
+        serializer = self.get_serializer(data=item)
+        serializer.is_valid()
+        errors = dict(serializer.errors)
+        username = item.get('author') if isinstance(item, dict) else None
+        author = authors.get(username) if username else self.request.user
+        if author is None:
+            errors['author'] = ['User not found.']
+        if errors:
+            return errors
+        return self.build_bulk_instance(
+            {**serializer.validated_data, 'author': author}
+        )
+
+    @action(detail=False, methods=['post'], permission_classes=(AdminOnly,))
+    def bulk(self, request, *args, **kwargs):
+        items = request.data
+        check_bulk_payload(items, self.bulk_max_items)
+        authors = User.objects.in_bulk({
+            item['author'] for item in items
+            if isinstance(item, dict) and item.get('author')
+        }, field_name='username')
+        entries = [self.validate_bulk_item(item, authors) for item in items]
+
+        valid = [
+            position for position, entry in enumerate(entries)
+            if isinstance(entry, models.Model)
+        ]
+        errors = self.check_bulk_instances(
+            [entries[position] for position in valid]
+        )
+        for index, error in errors.items():
+            entries[valid[index]] = error
+
+        instances = [
+            entry for entry in entries if isinstance(entry, models.Model)
+        ]
+        if instances:
+            with transaction.atomic():
+                self.perform_bulk_create(instances)
+
+        results = [
+            {'status': status.HTTP_201_CREATED,
+             'data': self.get_serializer(entry).data}
+            if isinstance(entry, models.Model)
+            else {'status': status.HTTP_400_BAD_REQUEST, 'errors': entry}
+            for entry in entries
+        ]
+        if len(instances) == len(entries):
+            code = status.HTTP_201_CREATED
+        elif instances:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=code)
@@ -0,0 +1,152 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class KeysetPagination(BasePagination):
+
+    '''
+    Постраничный вывод по ключу сортировки: без COUNT(*) и OFFSET.
+    Курсор хранит значения полей `ordering` крайней записи страницы
+    и направление обхода, для клиента он непрозрачен.
+    '''
+
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return (cls.cursor_query_param in params
+                or params.get(cls.mode_query_param) == cls.mode)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        position, self.reverse = cursor if cursor else (None, False)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(_invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def after(self, ordering, position):
+        '''
+        Условие «строго после `position`» для составного ключа.
+        '''
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps({'p': position, 'r': reverse}).encode()
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, urlsafe_b64encode(data).decode()
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode()))
+            position, reverse = data['p'], bool(data['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or (
+                len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class ChangeFeedPagination(KeysetPagination):
+
+    '''
+    Лента изменений: `since` — курсор последней полученной записи.
+    Ссылка `next` есть всегда, чтобы потребитель продолжал опрос
+    с того же места, даже когда новых записей пока нет.
+    '''
+
+    cursor_query_param = 'since'
+    page_size = 100
+
+    def __init__(self):
+        super().__init__(('id',))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('has_more', self.has_next),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.page:
+            return self.base_url
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
@@ -0,0 +1,77 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class EchoBuffer:
+
+    '''
+    Файлоподобный объект для `csv.writer`: строка не копится,
+    а сразу возвращается вызывающему.
+    '''
+
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+
+    '''
+    Одна JSON-запись на строку. `stream` отдаёт строки по одной
+    для `StreamingHttpResponse`.
+    '''
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def encode(self, row):
+        return json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(self.encode(row) for row in rows).encode()
+
+    def stream(self, rows, fields):
+        for row in rows:
+            yield self.encode(row)
+
+
+class CSVRenderer(BaseRenderer):
+
+    '''
+    CSV с заголовком из имён полей. Списки записываются в ячейку
+    через запятую.
+    '''
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows else []
+        return ''.join(self.stream(rows, fields)).encode()
+
+    def stream(self, rows, fields):
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([
+                self.encode(row.get(field)) for field in fields
+            ])
+
+    def encode(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (list, tuple)):
+            return ','.join(str(item) for item in value)
+        if isinstance(value, dict):
+            return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+        return value
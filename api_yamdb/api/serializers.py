@@ -1,11 +1,16 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db.models import Q
 from rest_framework import exceptions, serializers
 from rest_framework.relations import SlugRelatedField
-from rest_framework.validators import UniqueTogetherValidator, ValidationError
+from rest_framework.validators import UniqueTogetherValidator
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, ChangeLog, Comment, Genre, Review,
+                            Title)
+from .authentication_backend import ClaimsJWTAuthentication, claims_version
+from .cache import get_cache, get_versions, make_key
 from .fields import ConfirmationCodeField
 
 UNIQUE_REVIEW = 'Вы уже оставили отзыв к данному произведению'
@@ -49,18 +54,69 @@ class UserMeSerializer(serializers.ModelSerializer):
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
+
+    '''
+    Занятость username и email проверяется одним запросом для обоих
+    полей. Ошибки те же, что у валидаторов уникальности модели;
+    одновременную регистрацию отсекают ограничения базы.
+    '''
+
+    unique_fields = ('username', 'email')
+
     class Meta:
         model = User
         fields = (
             'username',
             'email',
         )
-        validators = [
-            UniqueTogetherValidator(
-                queryset=User.objects.all(),
-                fields=['username', 'email']
-            )
-        ]
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'validators': []},
+        }
+
+    def to_internal_value(self, data):
+        self.checked = {}
+        try:
+            attrs = super().to_internal_value(data)
+        except serializers.ValidationError as error:
+            attrs, errors = None, dict(error.detail)
+        else:
+            errors = {}
+        errors.update(self.get_conflicts(self.checked))
+        if errors:
+            # Ошибки полей — в порядке полей, остальные (например,
+            # `non_field_errors` для тела не словарём) — следом.
+            ordered = {
+                name: errors[name] for name in self.fields if name in errors
+            }
+            ordered.update(errors)
+            raise serializers.ValidationError(ordered)
+        return attrs
+
+    def get_conflicts(self, values):
+        '''
+        Ошибки для уже занятых значений `values` — словаря
+        поле: значение.
+        '''
+        if not values:
+            return {}
+        lookup = Q()
+        for name, value in values.items():
+            lookup |= Q(**{name: value})
+        taken = User.objects.filter(lookup).values_list(*values)
+        errors = {}
+        for row in taken:
+            for name, value in zip(values, row):
+                if value == values[name]:
+                    errors[name] = [self.unique_error_message(name)]
+        return errors
+
+    def unique_error_message(self, name):
+        field = User._meta.get_field(name)
+        return field.error_messages['unique'] % {
+            'model_name': User._meta.verbose_name,
+            'field_label': field.verbose_name,
+        }
 
     def validate_username(self, value):
 
@@ -70,14 +126,16 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
         if 'me' == value.lower():
             raise serializers.ValidationError('Invalid value of username')
+        self.checked['username'] = value
         return value
 
     def validate_email(self, value):
-        try:
-            if User.objects.get(email=value):
-                raise serializers.ValidationError('Email is occupied')
-        except User.DoesNotExist:
-            return value
+        self.checked['email'] = value
+        return value
+
+
+def unknown_username_key(username):
+    return make_key('token:unknown-username', (), [('username', [username])])
 
 
 class GetTokenSerializer(serializers.Serializer):
@@ -86,18 +144,37 @@ class GetTokenSerializer(serializers.Serializer):
 
     @classmethod
     def get_token(cls, user):
-        return RefreshToken.for_user(user)
+        '''
+        Кроме идентификатора, токен несёт роль пользователя и версию
+        этих claims для `ClaimsJWTAuthentication`.
+        '''
+        token = RefreshToken.for_user(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_superuser'] = user.is_superuser
+        token[ClaimsJWTAuthentication.version_claim], = get_versions(
+            claims_version(user.pk)
+        )
+        return token
 
     def validate_username(self, value):
-        try:
-            if User.objects.get(username=value):
-                return value
-        except User.DoesNotExist:
+        '''
+        Пользователь загружается один раз, здесь же. Неизвестные имена
+        ненадолго запоминаются в кеше, и повтор не идёт в базу.
+        '''
+        cache = get_cache()
+        key = unknown_username_key(value)
+        if cache.get(key):
             raise exceptions.NotFound()
+        self.user = User.objects.filter(username=value).first()
+        if self.user is None:
+            cache.set(key, True, settings.UNKNOWN_USERNAME_CACHE_TIMEOUT)
+            raise exceptions.NotFound()
+        return value
 
     def validate(self, attrs):
-        self.user = get_object_or_404(User, username=attrs['username'])
-        if self.user.check_confirmation_code(attrs['confirmation_code']):
+        if (self.user.check_confirmation_code(attrs['confirmation_code'])
+                and self.user.use_confirmation_code()):
             refresh = self.get_token(self.user)
             return {'access': str(refresh.access_token)}
         raise serializers.ValidationError('The data is not valid')
@@ -120,10 +197,11 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitleSerializer(serializers.ModelSerializer):
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
-    rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+        )
         model = Title
 
 
@@ -139,7 +217,25 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+        )
+        model = Title
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+
+    '''
+    Элемент массовой загрузки произведений: категория и жанры
+    передаются слагами и разрешаются вьюсетом для всего набора сразу.
+    '''
+
+    id = serializers.IntegerField(required=False, min_value=1)
+    category = serializers.SlugField(required=False, allow_null=True)
+    genre = serializers.ListField(child=serializers.SlugField())
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
 
 
@@ -155,16 +251,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         read_only_fields = ('id', 'author', 'pub_date')
 
-    def validate(self, data):
-        if self.context['request'].method != 'POST':
-            return data
-        if Review.objects.filter(
-            author=self.context['request'].user,
-            title=self.context['view'].kwargs.get('title_id')
-        ).exists():
-            raise ValidationError(UNIQUE_REVIEW)
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     author = SlugRelatedField(
@@ -176,3 +262,33 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
         read_only_fields = ('id', 'author', 'pub_date')
+
+
+class ReviewWithCommentsSerializer(ReviewSerializer):
+    comments = CommentSerializer(
+        source='expanded_comments', many=True, read_only=True
+    )
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('comments',)
+
+
+class TitleWithReviewsSerializer(TitleSerializer):
+    reviews = ReviewSerializer(
+        source='expanded_reviews', many=True, read_only=True
+    )
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('reviews',)
+
+
+class TitleWithCommentsSerializer(TitleWithReviewsSerializer):
+    reviews = ReviewWithCommentsSerializer(
+        source='expanded_reviews', many=True, read_only=True
+    )
+
+
+class ChangeLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = ('id', 'model', 'object_id', 'action', 'created')
+        model = ChangeLog
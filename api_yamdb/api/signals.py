@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import ChangeLog, Review, Title, changes_logged
+from .authentication_backend import claims_version
+from .cache import (TITLE_RATINGS_VERSION, bump_versions_on_commit,
+                    get_cache, parent_versions, version_name)
+from .serializers import unknown_username_key
+
+User = get_user_model()
+
+# Модели, версии отдельных объектов которых входят в ETag. У остальных
+# читается только версия модели целиком.
+VERSIONED_OBJECTS = (Title, Review)
+
+
+@receiver(changes_logged)
+def bump_logged_versions(sender, ids, action, instances=(), **kwargs):
+    '''
+    Всё, что попало в журнал изменений, делает устаревшими ответы
+    по модели, по изменённым или удалённым объектам и по их
+    родителям — и при записи в обход вьюсетов: `update()` рейтинга,
+    загрузка CSV, админка. У нового объекта своей версии ещё никто
+    не читал.
+    '''
+    items = [sender]
+    if sender is Title:
+        items.append(TITLE_RATINGS_VERSION)
+    if sender in VERSIONED_OBJECTS and action != ChangeLog.CREATE:
+        items.extend(sender(pk=pk) for pk in ids)
+    for instance in instances:
+        items.extend(parent_versions(instance))
+    bump_versions_on_commit(*dict.fromkeys(map(version_name, items)))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_versions(sender, **kwargs):
+    bump_versions_on_commit(User)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def revoke_claims(sender, instance, **kwargs):
+    '''
+    Выданные пользователю токены больше не заменяют чтение из базы:
+    роль, имя или активность могли измениться.
+    '''
+    bump_versions_on_commit(claims_version(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def forget_unknown_username(sender, instance, **kwargs):
+    '''
+    Имя могло попасть в кеш неизвестных до создания пользователя
+    или до переименования.
+    '''
+    key = unknown_username_key(instance.username)
+    transaction.on_commit(lambda: get_cache().delete(key))
@@ -0,0 +1,114 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+from .cache import get_cache
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+
+    '''
+    Скользящее окно из двух счётчиков: текущего окна и предыдущего,
+    взятого с весом оставшейся в нём доли. Счётчики живут в общем
+    кеше API и увеличиваются атомарным `incr`, поэтому лимит общий
+    для всех процессов. В отличие от `SimpleRateThrottle`, в кеше
+    не хранится список времён запросов.
+    '''
+
+    @property
+    def cache(self):
+        return get_cache()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window, self.elapsed = divmod(self.timer(), self.duration)
+        current = f'{self.key}:{int(window)}'
+        previous = f'{self.key}:{int(window) - 1}'
+        if self.cache.add(current, 1, self.duration * 2):
+            self.current = 1
+        else:
+            try:
+                self.current = self.cache.incr(current)
+            except ValueError:
+                self.cache.add(current, 1, self.duration * 2)
+                self.current = 1
+        self.previous = self.cache.get(previous, 0)
+        weight = 1 - self.elapsed / self.duration
+        if self.previous * weight + self.current > self.num_requests:
+            # Отклонённый запрос не расходует лимит.
+            self.cache.decr(current)
+            self.current -= 1
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        '''
+        Время, через которое оценка снова станет меньше лимита.
+        '''
+        remaining = self.duration - self.elapsed
+        allowed = self.num_requests - self.current - 1
+        if self.previous and allowed >= 0:
+            return max(
+                0, self.duration * (1 - allowed / self.previous)
+                - self.elapsed
+            )
+        return remaining
+
+
+class SignupThrottle(SlidingWindowThrottle):
+    scope = 'signup'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
+
+
+class TokenThrottle(SignupThrottle):
+    scope = 'token'
+
+
+class TokenUsernameThrottle(SlidingWindowThrottle):
+
+    '''
+    Лимит попыток получить токен для одного username независимо
+    от адреса клиента — против перебора кода подтверждения.
+    '''
+
+    scope = 'token_username'
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': str(username).lower()
+        }
+
+
+class PostThrottle(SlidingWindowThrottle):
+
+    '''
+    Лимит на создание объектов одним пользователем.
+    '''
+
+    def get_cache_key(self, request, view):
+        if request.method != 'POST':
+            return None
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class ReviewPostThrottle(PostThrottle):
+    scope = 'reviews'
+
+
+class CommentPostThrottle(PostThrottle):
+    scope = 'comments'
@@ -5,3 +5,24 @@ def check_role(request, *args):
         elif request.user.is_superuser:
             return True
     return False
+
+
+def iterate_batches(queryset, batch_size):
+    '''
+    Обходит выборку пачками по первичному ключу. Связи из
+    `prefetch_related` подгружаются для каждой пачки отдельно,
+    поэтому в памяти не больше `batch_size` объектов.
+    '''
+    last_pk = None
+    queryset = queryset.order_by('pk')
+    while True:
+        batch = queryset
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
@@ -1,31 +1,66 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import (Count, ExpressionWrapper, F, IntegerField,
+                              OuterRef, Prefetch, Subquery)
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import exceptions, permissions, status, viewsets
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.filters import SearchFilter
+from rest_framework.mixins import ListModelMixin
 from rest_framework.pagination import (LimitOffsetPagination,
                                        PageNumberPagination)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.views import TokenViewBase
 
-from reviews.models import Category, Genre, Review, Title
-from .filter import TitleFilter
-from .mixins import ListOrCreateOrDestroy
+from reviews.models import (Category, ChangeLog, Comment, Genre, Review,
+                            Title)
+from users.models import OutboxEmail
+from .cache import (TITLE_RATINGS_VERSION, get_cache, get_shared_versions,
+                    make_key)
+from .filter import TitleFilter, TitleSearchFilter
+from .mixins import (BulkCreateMixin, AtomicWriteMixin, CachedListMixin,
+                     ConditionalGetMixin, KeysetPaginationMixin,
+                     ListOrCreateOrDestroy, SparseFieldsMixin,
+                     assign_bulk_pks, check_bulk_payload)
+from .pagination import ChangeFeedPagination
 from .permissions import (AdminOnly, AuthorOrAdminOrModeratorOnly,
                           ReadOrAdminOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import (UNIQUE_REVIEW, CategorySerializer,
+                          ChangeLogSerializer, CommentSerializer,
                           GenreSerializer, GetTokenSerializer,
-                          ReviewSerializer, TitleCreateSerializer,
-                          TitleSerializer, UserMeSerializer,
-                          UserRegistrationSerializer, UserSerializer)
+                          ReviewSerializer,
+                          TitleBulkSerializer, TitleCreateSerializer,
+                          TitleSerializer, TitleWithCommentsSerializer,
+                          TitleWithReviewsSerializer,
+                          UserMeSerializer, UserRegistrationSerializer,
+                          UserSerializer)
+from .throttling import (CommentPostThrottle, ReviewPostThrottle,
+                         SignupThrottle, TokenThrottle, TokenUsernameThrottle)
+from .utils import iterate_batches
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+def latest(model, parent_field, limit):
+    '''
+    Не больше `limit` последних записей `model` на каждого родителя
+    по полю `parent_field` — для `Prefetch` вложенных списков.
+    '''
+    first = model.objects.filter(
+        **{parent_field: OuterRef(parent_field)}
+    ).order_by('-pub_date', '-id').values('pk')[:limit]
+    return model.objects.filter(pk__in=Subquery(first)).select_related(
+        'author').order_by('-pub_date', '-id')
+
+
+class UserViewSet(SparseFieldsMixin, AtomicWriteMixin, KeysetPaginationMixin,
+                  viewsets.ModelViewSet):
 
     '''
     Предоставляет возможность работать объектами пользователей:
@@ -43,13 +78,39 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ['username']
     lookup_field = 'username'
 
+    def get_queryset(self):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return super().get_queryset()
+        return User.objects.only(
+            'id', *(fields & set(UserSerializer.Meta.fields))
+        )
+
     def get_serializer_class(self):
         if self.action == 'me':
             return UserMeSerializer
         return self.serializer_class
 
     def get_instance(self):
-        return self.request.user
+        user = self.request.user
+        if user.get_deferred_fields():
+            # Пользователь собран из claims токена, а `me` отдаёт
+            # и меняет все поля.
+            user = User.objects.get(pk=user.pk)
+        return user
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        '''
+        Вместе с пользователем удаляются его отзывы, поэтому рейтинги
+        затронутых произведений пересчитываются.
+        '''
+        titles = list(Title.objects.filter(
+            reviews__author=instance).distinct().only('pk'))
+        super().perform_destroy(instance)
+        if titles:
+            Title.objects.filter(
+                pk__in=[title.pk for title in titles]).rebuild_rating()
 
     @action(
         methods=['get', 'put', 'patch', 'delete'],
@@ -71,6 +132,7 @@ class UserViewSet(viewsets.ModelViewSet):
 class Custom_TokenObtainPairView(TokenViewBase):
     ''' Получение JWT-токена в обмен на username и confirmation code. '''
     serializer_class = GetTokenSerializer
+    throttle_classes = (TokenThrottle, TokenUsernameThrottle)
 
 
 custom_token_obtain_pair = Custom_TokenObtainPairView.as_view()
@@ -78,31 +140,43 @@ custom_token_obtain_pair = Custom_TokenObtainPairView.as_view()
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([SignupThrottle])
 def get_confirmation_code(request):
     '''
     Получить код подтверждения на переданный email.
     Права доступа: Доступно без токена.
     Использовать имя 'me' в качестве username запрещено.
     Поля email и username должны быть уникальными.
+    Письмо с кодом ставится в очередь, его отправляет `send_outbox`.
     '''
     serializer = UserRegistrationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    _user = User.objects.create(
+    _user = User(
         username=serializer.validated_data['username'],
         email=serializer.validated_data['email'],
     )
     confirmation_code = _user.make_confirmation_code()
     _user.set_confirmation_code(confirmation_code=confirmation_code)
-    _user.save()
-    _user.email_user(
-        subject='Создан confirmation code для получения token',
-        message=f'Ваш confirmation code {confirmation_code}',
-        from_email=settings.EMAIL_HOST_USER,
-    )
+    try:
+        with transaction.atomic():
+            _user.save()
+            OutboxEmail.objects.create(
+                to=_user.email,
+                subject='Создан confirmation code для получения token',
+                body=f'Ваш confirmation code {confirmation_code}',
+                from_email=settings.EMAIL_HOST_USER,
+            )
+    except IntegrityError:
+        # Те же username или email только что заняла параллельная
+        # регистрация.
+        raise exceptions.ValidationError(
+            serializer.get_conflicts(serializer.validated_data) or None
+        )
     return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(ListOrCreateOrDestroy):
+class CategoryViewSet(CachedListMixin, AtomicWriteMixin,
+                      ListOrCreateOrDestroy):
     queryset = Category.objects.all().order_by('id')
     serializer_class = CategorySerializer
     filter_backends = (SearchFilter,)
@@ -112,7 +186,8 @@ class CategoryViewSet(ListOrCreateOrDestroy):
     permission_classes = (ReadOrAdminOnly,)
 
 
-class GenreViewSet(ListOrCreateOrDestroy):
+class GenreViewSet(CachedListMixin, AtomicWriteMixin,
+                   ListOrCreateOrDestroy):
     queryset = Genre.objects.all().order_by('id')
     serializer_class = GenreSerializer
     filter_backends = (SearchFilter,)
@@ -122,22 +197,310 @@ class GenreViewSet(ListOrCreateOrDestroy):
     permission_classes = (ReadOrAdminOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('id')
-    filter_backends = (SearchFilter, DjangoFilterBackend)
-    search_fields = ['category', 'genre', 'name', 'year']
+class TitleViewSet(SparseFieldsMixin, ConditionalGetMixin, AtomicWriteMixin,
+                   KeysetPaginationMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('id')
+    filter_backends = (TitleSearchFilter, DjangoFilterBackend)
+    search_fields = ['category__name', 'genre__name', 'name', 'year']
     filterset_class = TitleFilter
     pagination_class = PageNumberPagination
     permission_classes = (ReadOrAdminOnly,)
+    bulk_max_items = 5000
+    expand_query_param = 'expand'
+    expand_reviews_limit = 5
+    expand_comments_limit = 3
+
+    def get_expand(self):
+        '''
+        Связи из `?expand=reviews,reviews.comments`, которые нужно
+        встроить в ответ. Комментарии подразумевают отзывы.
+        '''
+        if self.request.method not in permissions.SAFE_METHODS:
+            return set()
+        value = self.request.query_params.get(self.expand_query_param, '')
+        expand = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = expand - {'reviews', 'reviews.comments'}
+        if unknown:
+            raise exceptions.ValidationError({
+                self.expand_query_param: [
+                    f'Unknown relations: {", ".join(sorted(unknown))}.'
+                ]
+            })
+        if 'reviews.comments' in expand:
+            expand.add('reviews')
+        return expand
+
+    def get_queryset(self):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            queryset = super().get_queryset()
+        else:
+            queryset = Title.objects.order_by('id').only(
+                'id', *(fields & {'name', 'year', 'rating', 'description',
+                                  'category'})
+            )
+            if 'category' in fields:
+                queryset = queryset.select_related('category')
+            if 'genre' in fields:
+                queryset = queryset.prefetch_related('genre')
+        if fields is None or 'reviews' in fields:
+            queryset = self.expand_queryset(queryset)
+        return queryset
+
+    def expand_queryset(self, queryset):
+        '''
+        Первые отзывы каждого произведения и первые комментарии каждого
+        отзыва загружаются одним запросом на уровень: лимит на родителя
+        задаёт коррелированный подзапрос.
+        '''
+        expand = self.get_expand()
+        if 'reviews' in expand:
+            queryset = queryset.prefetch_related(Prefetch(
+                'reviews',
+                queryset=latest(Review, 'title_id', self.expand_reviews_limit),
+                to_attr='expanded_reviews',
+            ))
+        if 'reviews.comments' in expand:
+            queryset = queryset.prefetch_related(Prefetch(
+                'expanded_reviews__comments',
+                queryset=latest(
+                    Comment, 'review_id', self.expand_comments_limit
+                ),
+                to_attr='expanded_comments',
+            ))
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('create', 'update', 'partial_update'):
             return TitleCreateSerializer
+        expand = self.get_expand()
+        if 'reviews.comments' in expand:
+            return TitleWithCommentsSerializer
+        if 'reviews' in expand:
+            return TitleWithReviewsSerializer
         return TitleSerializer
 
+    def get_etag_versions(self):
+        if self.action == 'retrieve':
+            versions = (Title(pk=self.kwargs['pk']), Genre, Category)
+        else:
+            versions = (Title, TITLE_RATINGS_VERSION, Genre, Category)
+        expand = self.get_expand()
+        if 'reviews' in expand:
+            versions += (User,)
+        if 'reviews.comments' in expand:
+            versions += (Comment,)
+        return versions
+
+    @action(detail=False)
+    def facets(self, request):
+        '''
+        Количество произведений по жанрам, категориям и интервалам лет
+        для текущего набора фильтров. Ответ кешируется до изменения
+        произведений, жанров или категорий.
+        '''
+        bucket = request.query_params.get('year_bucket', '10')
+        if not bucket.isdigit() or int(bucket) < 1:
+            raise exceptions.ValidationError(
+                {'year_bucket': 'Must be a positive integer'}
+            )
+        versions = get_shared_versions(Title, Genre, Category)
+        if versions is None:
+            return Response(self.get_facets(
+                self.filter_queryset(self.get_queryset()), int(bucket)
+            ))
+        key = make_key(
+            'title-facets', versions, request.query_params.lists()
+        )
+        data = get_cache().get(key)
+        if data is None:
+            data = self.get_facets(
+                self.filter_queryset(self.get_queryset()), int(bucket)
+            )
+            get_cache().set(key, data, settings.API_CACHE_TIMEOUT)
+        return Response(data)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        '''
+        Массовое создание и изменение произведений: элементы с `id`
+        изменяются, без `id` — создаются. Слаги категорий и жанров
+        разрешаются одним запросом на модель, произведения и их связи
+        с жанрами пишутся пакетно в одной транзакции.
+        '''
+        items = request.data
+        check_bulk_payload(items, self.bulk_max_items)
+        item_serializers = [
+            TitleBulkSerializer(
+                data=item, partial=isinstance(item, dict) and 'id' in item
+            ) for item in items
+        ]
+        valid = [
+            serializer.validated_data for serializer in item_serializers
+            if serializer.is_valid()
+        ]
+        categories = Category.objects.in_bulk(
+            {data['category'] for data in valid if data.get('category')},
+            field_name='slug'
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for data in valid for slug in data.get('genre', ())},
+            field_name='slug'
+        )
+        titles = Title.objects.in_bulk(
+            [data['id'] for data in valid if 'id' in data]
+        )
+
+        seen = set()
+        entries = [
+            self.build_bulk_title(
+                serializer, titles, categories, genres, seen
+            ) for serializer in item_serializers
+        ]
+        changed = [entry for entry in entries if isinstance(entry, tuple)]
+        if changed:
+            with transaction.atomic():
+                self.perform_bulk_save(changed)
+
+        results = []
+        for serializer, entry in zip(item_serializers, entries):
+            if not isinstance(entry, tuple):
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST, 'errors': entry
+                })
+                continue
+            title, _, created = entry
+            results.append({
+                'status': (status.HTTP_201_CREATED if created
+                           else status.HTTP_200_OK),
+                'data': {**serializer.validated_data, 'id': title.pk},
+            })
+        if len(changed) == len(entries):
+            code = status.HTTP_200_OK
+        elif changed:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=code)
+
+    def build_bulk_title(self, serializer, titles, categories, genres,
+                         seen):
+        '''
+        Готовит произведение к записи: `(title, жанры или None, создано)`
+        либо словарь ошибок элемента. Повтор `id`, уже встреченного
+        в запросе (`seen`), — ошибка элемента.
+        '''
+        if not serializer.is_valid():
+            return serializer.errors
+        data = dict(serializer.validated_data)
+        errors = {}
+        created = 'id' not in data
+        title = self.get_bulk_title(data.pop('id', None), titles, seen)
+        if isinstance(title, str):
+            errors['id'] = [title]
+        if data.get('category') and data['category'] not in categories:
+            errors['category'] = ['Category not found.']
+        missing = [
+            slug for slug in data.get('genre', ()) if slug not in genres
+        ]
+        if missing:
+            errors['genre'] = [f'Genre not found: {", ".join(missing)}.']
+        if errors:
+            return errors
+
+        if 'category' in data:
+            slug = data.pop('category')
+            title.category = categories[slug] if slug else None
+        title_genres = None
+        if 'genre' in data:
+            title_genres = [
+                genres[slug] for slug in dict.fromkeys(data.pop('genre'))
+            ]
+        for field, value in data.items():
+            setattr(title, field, value)
+        return title, title_genres, created
+
+    def get_bulk_title(self, pk, titles, seen):
+        '''
+        Произведение элемента: новое, если `id` не задан, иначе
+        найденное по `id`; текст ошибки, если `id` неизвестен
+        или повторяется.
+        '''
+        if pk is None:
+            return Title()
+        if pk in seen:
+            return 'Duplicate id in request.'
+        if pk not in titles:
+            return 'Title not found.'
+        seen.add(pk)
+        return titles[pk]
+
+    def perform_bulk_save(self, changed):
+        created = [title for title, _, is_new in changed if is_new]
+        updated = [title for title, _, is_new in changed if not is_new]
+        Title.objects.bulk_create(created)
+        assign_bulk_pks(Title, created)
+        Title.objects.bulk_update(
+            updated, ['name', 'year', 'description', 'category']
+        )
+
+        relinked = [title.pk for title, genres, is_new in changed
+                    if genres is not None and not is_new]
+        Through = Title.genre.through
+        Through.objects.filter(title_id__in=relinked).delete()
+        links = dict.fromkeys(
+            (title.pk, genre.pk)
+            for title, genres, _ in changed
+            for genre in (genres or ())
+        )
+        Through.objects.bulk_create(
+            Through(title_id=title_id, genre_id=genre_id)
+            for title_id, genre_id in links
+        )
+        ChangeLog.objects.log(
+            Title, [title.pk for title in created], ChangeLog.CREATE
+        )
+        ChangeLog.objects.log(
+            Title, [title.pk for title in updated], ChangeLog.UPDATE
+        )
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_facets(self, queryset, bucket):
+        titles = Title.objects.filter(pk__in=queryset.order_by().values('pk'))
+        genres = Title.genre.through.objects.filter(
+            title__in=titles.values('pk')
+        ).values('genre__slug', 'genre__name').annotate(
+            count=Count('title', distinct=True)
+        ).order_by('genre__slug')
+        categories = titles.filter(category__isnull=False).values(
+            'category__slug', 'category__name'
+        ).annotate(count=Count('pk')).order_by('category__slug')
+        years = titles.annotate(year_from=ExpressionWrapper(
+            F('year') / bucket * bucket, output_field=IntegerField()
+        )).values('year_from').annotate(
+            count=Count('pk')
+        ).order_by('year_from')
+        return {
+            'genre': [
+                {'slug': row['genre__slug'], 'name': row['genre__name'],
+                 'count': row['count']} for row in genres
+            ],
+            'category': [
+                {'slug': row['category__slug'],
+                 'name': row['category__name'],
+                 'count': row['count']} for row in categories
+            ],
+            'year': [
+                {'from': row['year_from'],
+                 'to': row['year_from'] + bucket - 1,
+                 'count': row['count']} for row in years
+            ],
+        }
+
+
+class ReviewViewSet(SparseFieldsMixin, BulkCreateMixin, ConditionalGetMixin,
+                    AtomicWriteMixin, KeysetPaginationMixin,
+                    viewsets.ModelViewSet):
 
     '''
     Предоставляет возможность работать с отзывами к произведениям:
@@ -147,22 +510,103 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    keyset_ordering = ('-pub_date', '-id')
     permission_classes = (AuthorOrAdminOrModeratorOnly,
                           permissions.IsAuthenticatedOrReadOnly)
+    throttle_classes = (ReviewPostThrottle,)
+
+    def get_title(self):
+        '''
+        Произведение из URL: загружается один раз за запрос.
+        '''
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs['title_id'])
+        return self._title
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs['title_id'])
-        return title.reviews.all()
+        if self.action == 'list':
+            reviews = self.get_title().reviews
+        else:
+            reviews = Review.objects.filter(title_id=self.kwargs['title_id'])
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return reviews.select_related('author')
+        columns = {'id', 'pub_date'} | (fields & {'text', 'score'})
+        if 'author' in fields:
+            return reviews.select_related('author').only(
+                *columns, 'author__username'
+            )
+        return reviews.only(*columns)
+
+    def get_etag_versions(self):
+        return (Title(pk=self.kwargs['title_id']), User)
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user, title=get_object_or_404(
-                Title, id=self.kwargs['title_id']
+        try:
+            review = serializer.save(
+                author=self.request.user, title=self.get_title()
             )
+        except IntegrityError:
+            raise exceptions.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [UNIQUE_REVIEW]}
+            )
+        Title.objects.filter(pk=review.title_id).change_rating(
+            review.score, 1
+        )
+
+    def build_bulk_instance(self, validated_data):
+        return Review(title=self.get_title(), **validated_data)
+
+    def check_bulk_instances(self, instances):
+        existing = set(Review.objects.filter(
+            title=self.get_title(),
+            author__in=[review.author for review in instances],
+        ).values_list('author_id', flat=True))
+        errors = {}
+        for index, review in enumerate(instances):
+            if review.author_id in existing:
+                errors[index] = {
+                    api_settings.NON_FIELD_ERRORS_KEY: [UNIQUE_REVIEW]
+                }
+            existing.add(review.author_id)
+        return errors
+
+    def perform_bulk_create(self, instances):
+        try:
+            super().perform_bulk_create(instances)
+        except IntegrityError:
+            raise exceptions.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [UNIQUE_REVIEW]}
+            )
+        Title.objects.filter(pk=self.get_title().pk).change_rating(
+            sum(review.score for review in instances), len(instances)
         )
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Оценка перечитывается под блокировкой: объект вьюсета мог
+        # устареть из-за параллельного изменения.
+        old_score = Review.objects.select_for_update().values_list(
+            'score', flat=True).get(pk=serializer.instance.pk)
+        review = serializer.save()
+        if review.score != old_score:
+            Title.objects.filter(pk=review.title_id).change_rating(
+                review.score - old_score, 0
+            )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        _, deleted = instance.delete()
+        # Параллельный DELETE мог уже удалить отзыв и вычесть оценку.
+        if deleted.get(Review._meta.label) == 1:
+            Title.objects.filter(pk=instance.title_id).change_rating(
+                -instance.score, -1
+            )
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(BulkCreateMixin, ConditionalGetMixin, AtomicWriteMixin,
+                     KeysetPaginationMixin, viewsets.ModelViewSet):
 
     '''
     Предоставляет возможность работать с комментариями к отзывам:
@@ -171,17 +615,126 @@ class CommentViewSet(viewsets.ModelViewSet):
     '''
 
     serializer_class = CommentSerializer
+    keyset_ordering = ('-pub_date', '-id')
     permission_classes = (AuthorOrAdminOrModeratorOnly,
                           permissions.IsAuthenticatedOrReadOnly)
+    throttle_classes = (CommentPostThrottle,)
+
+    def get_review(self):
+        '''
+        Отзыв из URL с проверкой, что он относится к произведению
+        из URL. Загружается один раз за запрос.
+        '''
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title=self.kwargs['title_id'],
+            )
+        return self._review
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs['review_id'])
-        comments = review.comments.all()
-        return comments
+        if self.action == 'list':
+            comments = self.get_review().comments
+        else:
+            comments = Comment.objects.filter(
+                review_id=self.kwargs['review_id'],
+                review__title_id=self.kwargs['title_id'],
+            )
+        return comments.select_related('author')
+
+    def get_etag_versions(self):
+        return (Title(pk=self.kwargs['title_id']),
+                Review(pk=self.kwargs['review_id']), User)
+
+    def build_bulk_instance(self, validated_data):
+        return Comment(review=self.get_review(), **validated_data)
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs['review_id'],
-            title=self.kwargs['title_id'],)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+
+class ChangeLogViewSet(ListModelMixin, viewsets.GenericViewSet):
+
+    '''
+    Лента изменений произведений, жанров, категорий, отзывов
+    и комментариев для синхронизации внешних сервисов. Удаление
+    приходит записью с `action=delete`. Клиент хранит ссылку `next`
+    и продолжает с неё.
+    '''
+
+    queryset = ChangeLog.objects.all()
+    serializer_class = ChangeLogSerializer
+    permission_classes = (AdminOnly,)
+    pagination_class = ChangeFeedPagination
+
+
+class ExportViewSet(viewsets.GenericViewSet):
+
+    '''
+    Выгрузка всего каталога для администратора: произведения, отзывы
+    и комментарии отдаются потоком в NDJSON или CSV
+    (`?format=ndjson|csv` или заголовок Accept). Записи читаются
+    из базы пачками, поэтому расход памяти не зависит от объёма таблиц.
+    '''
+
+    permission_classes = (AdminOnly,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+    export_batch_size = 500
+
+    def stream(self, queryset, fields, get_row):
+        renderer = self.request.accepted_renderer
+        rows = (
+            get_row(instance)
+            for instance in iterate_batches(queryset, self.export_batch_size)
+        )
+        response = StreamingHttpResponse(
+            renderer.stream(rows, fields),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.action}.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=False)
+    def titles(self, request):
+        queryset = Title.objects.select_related('category').prefetch_related(
+            'genre')
+        fields = ('id', 'name', 'year', 'description', 'rating',
+                  'category', 'genre')
+        return self.stream(queryset, fields, lambda title: {
+            'id': title.id,
+            'name': title.name,
+            'year': title.year,
+            'description': title.description,
+            'rating': title.rating,
+            'category': title.category.slug if title.category else None,
+            'genre': [genre.slug for genre in title.genre.all()],
+        })
+
+    @action(detail=False)
+    def reviews(self, request):
+        queryset = Review.objects.select_related('author')
+        fields = ('id', 'title', 'author', 'text', 'score', 'pub_date')
+        return self.stream(queryset, fields, lambda review: {
+            'id': review.id,
+            'title': review.title_id,
+            'author': review.author.username,
+            'text': review.text,
+            'score': review.score,
+            'pub_date': review.pub_date.isoformat(),
+        })
+
+    @action(detail=False)
+    def comments(self, request):
+        queryset = Comment.objects.select_related('author')
+        fields = ('id', 'review', 'author', 'text', 'pub_date')
+        return self.stream(queryset, fields, lambda comment: {
+            'id': comment.id,
+            'review': comment.review_id,
+            'author': comment.author.username,
+            'text': comment.text,
+            'pub_date': comment.pub_date.isoformat(),
+        })
@@ -112,6 +112,27 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 
 AUTH_USER_MODEL = 'users.User'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кеш для ответов API и счётчиков версий данных. При нескольких
+# процессах нужен общий бэкенд (файловый или memcached), иначе
+# сброс версии виден только в том процессе, где прошла запись.
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 60 * 15
+# Сервер работает в одном процессе, и счётчикам версий в LocMemCache
+# можно доверять. Иначе с LocMemCache ETag, кеш списков и claims
+# токенов отключены.
+API_CACHE_SINGLE_PROCESS = False
+
+# Срок действия кода подтверждения, в секундах.
+CONFIRMATION_CODE_TIMEOUT = 60 * 60 * 24
+# Сколько секунд `/auth/token/` помнит, что такого username нет.
+UNKNOWN_USERNAME_CACHE_TIMEOUT = 30
+
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
@@ -120,10 +141,17 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication_backend.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '20/hour',
+        'token': '60/hour',
+        'token_username': '10/hour',
+        'reviews': '120/hour',
+        'comments': '120/hour',
+    },
 }
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=3660 * 2),
@@ -138,3 +166,11 @@ SERVER_EMAIL = EMAIL_HOST_USER
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 EMAIL_USE_TLS = False
 EMAIL_USE_SSL = True
+
+# Очередь писем (`manage.py send_outbox`): число попыток и задержка
+# перед первым повтором в секундах, дальше она удваивается. Взятое
+# в отправку письмо другие отправители не трогают EMAIL_OUTBOX_LEASE
+# секунд.
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF = 60
+EMAIL_OUTBOX_LEASE = 60 * 5
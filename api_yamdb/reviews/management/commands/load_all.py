@@ -0,0 +1,155 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews.management.base import (RowBuilder, keep_file_dates,
+                                     log_loaded, parse_csv)
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+# Файлы набора данных в порядке зависимостей между моделями.
+DATASET = (
+    ('users.csv', User),
+    ('category.csv', Category),
+    ('genre.csv', Genre),
+    ('titles.csv', Title),
+    ('genre_title.csv', Title.genre.through),
+    ('review.csv', Review),
+    ('comments.csv', Comment),
+)
+
+# Сколько ключей проверять в базе одним запросом.
+LOOKUP_CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = ('Load the whole static/data dataset in dependency order '
+            'in one transaction')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory', nargs='?',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Parsing processes, 0 parses in-process')
+
+    def handle(self, directory: str, *args, batch_size: int, workers: int,
+               **options):
+        dataset = []
+        for name, model in DATASET:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                dataset.append((path, model))
+            else:
+                self.stdout.write(self.style.WARNING(f'Skipped {name}'))
+        paths = [path for path, _ in dataset]
+
+        total = time.perf_counter()
+        start = time.perf_counter()
+        if workers:
+            with ProcessPoolExecutor(min(workers, len(paths) or 1)) as pool:
+                parsed = list(pool.map(parse_csv, paths))
+        else:
+            parsed = [parse_csv(path) for path in paths]
+        self.report('parse', sum(map(len, parsed)), start)
+
+        self.loaded = {}
+        with transaction.atomic():
+            for (path, model), rows in zip(dataset, parsed):
+                start = time.perf_counter()
+                count = self.load(model, rows, batch_size)
+                self.report(os.path.basename(path), count, start)
+            start = time.perf_counter()
+            Title.objects.rebuild_rating()
+            self.report('ratings', Title.objects.count(), start)
+            self.reset_sequences([model for _, model in dataset])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully loaded dataset in '
+            f'{time.perf_counter() - total:.1f}s'
+        ))
+
+    def load(self, model, rows, batch_size):
+        builder = RowBuilder(model)
+        values = self.resolve(model, [builder.get_values(row) for row in rows])
+        instances = [model(**row) for row in values]
+        with keep_file_dates(model):
+            model.objects.bulk_create(instances, batch_size=batch_size)
+        log_loaded(model, instances)
+        pk = model._meta.pk
+        self.loaded[model] = {
+            pk.to_python(row[pk.attname])
+            for row in values if row.get(pk.attname) is not None
+        }
+        return len(values)
+
+    def resolve(self, model, rows):
+        '''
+        Проверяет внешние ключи сразу для всех строк: ключ должен быть
+        загружен раньше в этом же наборе или уже лежать в базе.
+        Строки с неизвестным обязательным ключом пропускаются,
+        необязательный ключ обнуляется.
+        '''
+        for field in model._meta.concrete_fields:
+            if not field.many_to_one:
+                continue
+            target = field.related_model
+            to_python = target._meta.pk.to_python
+            for row in rows:
+                if row.get(field.attname) is not None:
+                    row[field.attname] = to_python(row[field.attname])
+            referenced = {
+                row[field.attname] for row in rows
+                if row.get(field.attname) is not None
+            }
+            known = self.find_existing(
+                target, referenced, self.loaded.get(target, set())
+            )
+            missing = [
+                row for row in rows
+                if row.get(field.attname) is not None
+                and row[field.attname] not in known
+            ]
+            if not missing:
+                continue
+            if field.null:
+                for row in missing:
+                    row[field.attname] = None
+            else:
+                skipped = {id(row) for row in missing}
+                rows = [row for row in rows if id(row) not in skipped]
+            self.stdout.write(self.style.WARNING(
+                f'{model._meta.label}: {len(missing)} rows with unknown '
+                f'{field.name} {"cleared" if field.null else "skipped"}'
+            ))
+        return rows
+
+    def find_existing(self, model, referenced, loaded):
+        known = referenced & loaded
+        unchecked = list(referenced - loaded)
+        for start in range(0, len(unchecked), LOOKUP_CHUNK_SIZE):
+            known.update(model.objects.filter(
+                pk__in=unchecked[start:start + LOOKUP_CHUNK_SIZE]
+            ).values_list('pk', flat=True))
+        return known
+
+    def reset_sequences(self, models):
+        # Ключи пришли из файлов: счётчики автоинкремента нужно сдвинуть.
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def report(self, stage, count, start):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{stage}: {count} rows in {elapsed:.2f}s'
+            f' ({count / elapsed if elapsed else 0:.0f} rows/sec)'
+        )
@@ -1,23 +1,12 @@
-import csv
+from django.core.management import call_command
 
-from django.core.management.base import BaseCommand
-
-import requests
+from reviews.management.base import CSVLoadCommand
 from reviews.models import Review
 
 
-class Command(BaseCommand):
-    help = 'Loading data from csv via url'
-
-    def add_arguments(self, parser):
-        parser.add_argument('link', type=str)
-
-    def handle(self, link: str, *args, **options):
-        response = requests.get(link)
-        reader = csv.DictReader(response.text.splitlines())
+class Command(CSVLoadCommand):
+    model = Review
 
-        Review.objects.bulk_create(
-            [Review(
-                **{k.lower(): v for k, v in data.items()}
-            ) for data in reader])
-        self.stdout.write(self.style.SUCCESS('Successfully loaded'))
+    def after_load(self):
+        # bulk_create обходит пересчёт рейтинга в API.
+        call_command('rebuild_ratings', stdout=self.stdout)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Rebuild stored title ratings from reviews in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size: int, **options):
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                Title.objects.filter(pk__gt=last_id)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                Title.objects.filter(pk__in=ids).rebuild_rating()
+            last_id = ids[-1]
+            total += len(ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {total} ratings')
+        )
@@ -0,0 +1,63 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:19
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import (Case, Count, F, FloatField, OuterRef, Subquery,
+                              Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+
+
+def fill_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    Title.objects.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')), 0
+        ),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')), 0
+        ),
+    )
+    Title.objects.update(
+        rating=Case(
+            When(
+                review_count__gt=0,
+                then=Cast('rating_sum', FloatField()) / F('review_count')
+            ),
+            default=Value(None),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_auto_20211014_0859'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='score',
+            field=models.SmallIntegerField(error_messages={'validators': 'Оценка может быть от 1 до 10'}, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)], verbose_name='Оценка'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+from django.db import migrations
+
+TABLE = 'reviews_title_search'
+
+REFRESH = f'''
+    DELETE FROM {TABLE} WHERE rowid IN ({{ids}});
+    INSERT INTO {TABLE} (rowid, name, description, category, genre, year)
+    SELECT t.id, t.name, coalesce(t.description, ''), coalesce(c.name, ''),
+           coalesce((SELECT group_concat(g.name, ' ')
+                     FROM reviews_title_genre tg
+                     JOIN reviews_genre g ON g.id = tg.genre_id
+                     WHERE tg.title_id = t.id), ''),
+           t.year
+    FROM reviews_title t
+    LEFT JOIN reviews_category c ON c.id = t.category_id
+    WHERE t.id IN ({{ids}});
+'''
+
+TRIGGERS = {
+    'reviews_title_search_ai': (
+        'AFTER INSERT ON reviews_title',
+        REFRESH.format(ids='NEW.id'),
+    ),
+    'reviews_title_search_au': (
+        'AFTER UPDATE OF name, description, category_id, year '
+        'ON reviews_title',
+        REFRESH.format(ids='NEW.id'),
+    ),
+    'reviews_title_search_ad': (
+        'AFTER DELETE ON reviews_title',
+        f'DELETE FROM {TABLE} WHERE rowid = OLD.id;',
+    ),
+    'reviews_title_search_gi': (
+        'AFTER INSERT ON reviews_title_genre',
+        REFRESH.format(ids='NEW.title_id'),
+    ),
+    'reviews_title_search_gd': (
+        'AFTER DELETE ON reviews_title_genre',
+        REFRESH.format(ids='OLD.title_id'),
+    ),
+    'reviews_title_search_cu': (
+        'AFTER UPDATE OF name ON reviews_category',
+        REFRESH.format(
+            ids='SELECT id FROM reviews_title WHERE category_id = NEW.id'
+        ),
+    ),
+    'reviews_title_search_nu': (
+        'AFTER UPDATE OF name ON reviews_genre',
+        REFRESH.format(
+            ids='SELECT title_id FROM reviews_title_genre '
+                'WHERE genre_id = NEW.id'
+        ),
+    ),
+}
+
+
+def has_fts5(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def create_search_index(apps, schema_editor):
+    if not has_fts5(schema_editor.connection):
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+        'name, description, category, genre, year)'
+    )
+    for name, (event, body) in TRIGGERS.items():
+        schema_editor.execute(
+            f'CREATE TRIGGER {name} {event} BEGIN {body} END'
+        )
+    schema_editor.execute(
+        REFRESH.format(ids='SELECT id FROM reviews_title').split(';')[1]
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if not has_fts5(schema_editor.connection):
+        return
+    for name in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
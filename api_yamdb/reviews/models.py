@@ -1,5 +1,9 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import (Case, Count, F, FloatField, OuterRef, Subquery,
+                              Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.dispatch import Signal
 
 from users.models import User
 from .validators import validator_year
@@ -30,6 +34,62 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    def change_rating(self, score_delta, count_delta):
+        '''
+        Сдвигает сумму и количество оценок на переданные величины
+        и пересчитывает средний рейтинг одним UPDATE.
+        '''
+        rating_sum = F('rating_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        ChangeLog.objects.log(
+            Title, self.values_list('pk', flat=True), ChangeLog.UPDATE
+        )
+        return self.update(
+            rating_sum=rating_sum,
+            review_count=review_count,
+            rating=Case(
+                When(
+                    review_count__gt=-count_delta,
+                    then=Cast(rating_sum, FloatField()) / review_count
+                ),
+                default=Value(None),
+                output_field=FloatField(),
+            ),
+        )
+
+    def rebuild_rating(self):
+        '''
+        Пересчитывает рейтинг по таблице отзывов для всех произведений
+        выборки.
+        '''
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        ChangeLog.objects.log(
+            Title, self.values_list('pk', flat=True), ChangeLog.UPDATE
+        )
+        self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0
+            ),
+        )
+        return self.update(
+            rating=Case(
+                When(
+                    review_count__gt=0,
+                    then=Cast('rating_sum', FloatField()) / F('review_count')
+                ),
+                default=Value(None),
+                output_field=FloatField(),
+            ),
+        )
+
+
 class Title(models.Model):
     name = models.CharField(max_length=100, verbose_name='Произведение')
     category = models.ForeignKey(
@@ -43,10 +103,25 @@ class Title(models.Model):
     )
 
     description = models.CharField(max_length=300, null=True)
+    rating = models.FloatField(
+        verbose_name='Рейтинг', null=True, editable=False
+    )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок', default=0, editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов', default=0, editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=['category', 'year'],
+                         name='title_category_year_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -82,6 +157,10 @@ class Review(models.Model):
             models.UniqueConstraint(fields=['title', 'author'],
                                     name='unique_review')
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date'],
+                         name='review_title_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
@@ -106,6 +185,70 @@ class Comment(models.Model):
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['review', 'pub_date'],
+                         name='comment_review_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
+
+
+# Посылается после записи в журнал: `sender` — модель, `ids` — ключи
+# изменённых объектов, `instances` — сами объекты, если они известны.
+changes_logged = Signal(providing_args=['ids', 'action', 'instances'])
+
+
+class ChangeLogQuerySet(models.QuerySet):
+    def log(self, model, ids, action, instances=()):
+        '''
+        Записывает изменение объектов `model` с ключами `ids`.
+        Вызывать в той же транзакции, что и само изменение.
+        По `instances` получатели сигнала находят родителей объектов.
+        '''
+        name = model._meta.model_name
+        ids = list(ids)
+        entries = self.bulk_create(
+            self.model(model=name, object_id=pk, action=action)
+            for pk in ids
+        )
+        if ids:
+            changes_logged.send(
+                sender=model, ids=ids, action=action, instances=instances
+            )
+        return entries
+
+
+class ChangeLog(models.Model):
+
+    '''
+    Журнал изменений каталога и отзывов: только дописывается,
+    первичный ключ служит курсором ленты изменений.
+    '''
+
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTION_CHOICES = (
+        (CREATE, 'Создание'),
+        (UPDATE, 'Изменение'),
+        (DELETE, 'Удаление'),
+    )
+    model = models.CharField(max_length=32, verbose_name='Модель')
+    object_id = models.PositiveIntegerField(verbose_name='Объект')
+    action = models.CharField(
+        max_length=6, choices=ACTION_CHOICES, verbose_name='Действие'
+    )
+    created = models.DateTimeField(
+        verbose_name='Время изменения', auto_now_add=True
+    )
+
+    objects = ChangeLogQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+
+    def __str__(self):
+        return f'{self.action} {self.model}:{self.object_id}'
@@ -0,0 +1,51 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .models import Category, ChangeLog, Comment, Genre, Review, Title
+
+TRACKED_MODELS = (Title, Genre, Category, Review, Comment)
+
+
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    action = ChangeLog.CREATE if created else ChangeLog.UPDATE
+    ChangeLog.objects.log(sender, [instance.pk], action, [instance])
+
+
+def log_delete(sender, instance, **kwargs):
+    ChangeLog.objects.log(
+        sender, [instance.pk], ChangeLog.DELETE, [instance]
+    )
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(log_save, sender=model)
+    post_delete.connect(log_delete, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_genre_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        ids = [instance.pk]
+    elif pk_set is not None:
+        ids = pk_set
+    else:
+        # post_clear со стороны жанра: связи уже удалены.
+        return
+    ChangeLog.objects.log(Title, ids, ChangeLog.UPDATE)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def log_unlinked_titles(sender, instance, **kwargs):
+    '''
+    Удаление категории или жанра меняет произведения без сигналов:
+    SET NULL и каскад по таблице связей идут одним запросом.
+    '''
+    ChangeLog.objects.log(
+        Title, instance.titles.values_list('pk', flat=True), ChangeLog.UPDATE
+    )
@@ -0,0 +1,94 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = ('Send queued emails in batches over one connection, '
+            'retrying failures with exponential backoff. Several '
+            'senders can run at once: each claims its batch for --lease '
+            'seconds')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int,
+                            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS)
+        parser.add_argument('--backoff', type=int,
+                            default=settings.EMAIL_OUTBOX_BACKOFF,
+                            help='Delay before the first retry, seconds')
+        parser.add_argument('--lease', type=int,
+                            default=settings.EMAIL_OUTBOX_LEASE,
+                            help='How long a claimed batch stays '
+                                 'reserved, seconds')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the outbox')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Polling interval with --loop, seconds')
+
+    def handle(self, *args, batch_size: int, max_attempts: int,
+               backoff: int, lease: int, loop: bool, interval: float,
+               **options):
+        self.backoff = backoff
+        sent = failed = 0
+        connection = get_connection()
+        try:
+            while True:
+                batch = OutboxEmail.objects.claim(
+                    max_attempts, batch_size, timedelta(seconds=lease)
+                )
+                if not batch:
+                    if not loop:
+                        break
+                    time.sleep(interval)
+                    continue
+                batch_sent = self.send_batch(connection, batch)
+                sent += batch_sent
+                failed += len(batch) - batch_sent
+        finally:
+            connection.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Sent {sent} emails, {failed} failed')
+        )
+
+    def send_batch(self, connection, batch):
+        sent = 0
+        for email in batch:
+            # Открытое соединение используется повторно, SMTP-бэкенд
+            # не закрывает его после каждого письма.
+            connection.open()
+            message = EmailMessage(
+                subject=email.subject, body=email.body,
+                from_email=email.from_email, to=[email.to],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                self.retry_later(email, error)
+                # Соединение могло оборваться: следующее письмо
+                # откроет новое.
+                connection.close()
+            else:
+                # Отметка сразу после отправки: если команда упадёт
+                # на следующем письме, это не уйдёт повторно.
+                email.sent_at = timezone.now()
+                email.save(update_fields=['sent_at'])
+                sent += 1
+        return sent
+
+    def retry_later(self, email, error):
+        email.attempts += 1
+        email.last_error = f'{type(error).__name__}: {error}'
+        email.next_attempt_at = timezone.now() + timedelta(
+            seconds=self.backoff * 2 ** (email.attempts - 1)
+        )
+        email.save(
+            update_fields=['attempts', 'last_error', 'next_attempt_at']
+        )
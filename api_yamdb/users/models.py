@@ -1,7 +1,15 @@
-from django.contrib.auth.hashers import check_password, make_password
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
-from django.utils.crypto import get_random_string
+from django.utils import timezone
+from django.utils.crypto import (constant_time_compare, get_random_string,
+                                 salted_hmac)
+
+CONFIRMATION_CODE_ALGORITHM = 'hmac'
+CONFIRMATION_CODE_SALT = 'users.User.confirmation_code'
 
 
 class User(AbstractUser):
@@ -40,7 +48,21 @@ class User(AbstractUser):
     objects = UserManager()
 
     def set_confirmation_code(self, confirmation_code):
-        self.confirmation_code = make_password(confirmation_code)
+        '''
+        Хранится HMAC кода на SECRET_KEY вместе со временем выдачи:
+        проверка стоит одного хеша, а не полного PBKDF2.
+        '''
+        issued = int(time.time())
+        self.confirmation_code = '$'.join((
+            CONFIRMATION_CODE_ALGORITHM, str(issued),
+            self._confirmation_digest(confirmation_code, issued),
+        ))
+
+    def _confirmation_digest(self, confirmation_code, issued):
+        return salted_hmac(
+            CONFIRMATION_CODE_SALT,
+            f'{self.username}:{issued}:{confirmation_code}',
+        ).hexdigest()
 
     def make_confirmation_code(
         self, length=6,
@@ -56,7 +78,32 @@ class User(AbstractUser):
         return get_random_string(length, allowed_chars)
 
     def check_confirmation_code(self, raw_confirmation_code: str) -> bool:
-        return check_password(raw_confirmation_code, self.confirmation_code)
+        algorithm, _, rest = self.confirmation_code.partition('$')
+        if algorithm != CONFIRMATION_CODE_ALGORITHM:
+            # Коды, выданные до перехода на HMAC, хранятся как пароли.
+            return check_password(
+                raw_confirmation_code, self.confirmation_code
+            )
+        issued, _, digest = rest.partition('$')
+        if not issued.isdigit() or (
+                time.time() - int(issued)
+                > settings.CONFIRMATION_CODE_TIMEOUT):
+            return False
+        return constant_time_compare(
+            digest,
+            self._confirmation_digest(raw_confirmation_code, int(issued)),
+        )
+
+    def use_confirmation_code(self) -> bool:
+        '''
+        Гасит проверенный код. Из параллельных запросов с одним кодом
+        успешен только один.
+        '''
+        used = type(self).objects.filter(
+            pk=self.pk, confirmation_code=self.confirmation_code,
+        ).exclude(confirmation_code='').update(confirmation_code='')
+        self.confirmation_code = ''
+        return bool(used)
 
     @property
     def is_user(self):
@@ -69,3 +116,67 @@ class User(AbstractUser):
     @property
     def is_admin(self):
         return self.role == self.ADMIN
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+    def due(self, max_attempts):
+        '''
+        Неотправленные письма, у которых подошло время очередной
+        попытки и не исчерпаны попытки.
+        '''
+        return self.filter(
+            sent_at__isnull=True,
+            attempts__lt=max_attempts,
+            next_attempt_at__lte=timezone.now(),
+        )
+
+    def claim(self, max_attempts, limit, lease):
+        '''
+        Забирает в отправку до `limit` писем: следующая попытка
+        сдвигается на `lease`, поэтому параллельный отправитель их
+        не возьмёт, а письма упавшего отправителя вернутся в очередь
+        по истечении срока.
+        '''
+        now = timezone.now()
+        until = now + lease
+        ids = list(self.due(max_attempts).order_by(
+            'next_attempt_at', 'id').values_list('pk', flat=True)[:limit])
+        self.filter(
+            pk__in=ids, sent_at__isnull=True, next_attempt_at__lte=now
+        ).update(next_attempt_at=until)
+        return list(
+            self.filter(pk__in=ids, next_attempt_at=until).order_by('id')
+        )
+
+
+class OutboxEmail(models.Model):
+
+    '''
+    Очередь исходящих писем. Запрос только ставит письмо в очередь,
+    отправляет его команда `send_outbox`.
+    '''
+
+    to = models.EmailField('Получатель', max_length=254)
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=254)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['sent_at', 'next_attempt_at'],
+                         name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def single_process_cache(settings):
+    # Тесты идут в одном процессе: счётчики версий в LocMemCache общие.
+    settings.API_CACHE_SINGLE_PROCESS = True
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.management import call_command
 
 import pytest
 
@@ -86,6 +87,11 @@ class Test00UserRegistration:
         }
         request_type = 'POST'
         response = client.post(self.url_signup, data=valid_data)
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что {request_type} запрос `{self.url_signup}` не отправляет '
+            f'письмо сам, а ставит его в очередь'
+        )
+        call_command('send_outbox')
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != 404, (
@@ -0,0 +1,122 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import UNIQUE_REVIEW
+from .common import create_reviews
+
+
+class Test08Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_stored_on_title(self, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        from reviews.models import Title
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (12, 3), (
+            'Проверьте, что сумма и количество оценок произведения '
+            'обновляются при создании отзыва'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что средний рейтинг хранится в модели `Title`'
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            data={'score': 8}
+        )
+        admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.review_count) == (12, 2), (
+            'Проверьте, что изменение и удаление отзыва обновляют '
+            'сохранённый рейтинг произведения'
+        )
+        assert title.rating == 6
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        from reviews.models import Title
+
+        Title.objects.update(rating=None, rating_sum=0, review_count=0)
+        call_command('rebuild_ratings', batch_size=1)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating, title.review_count) == (4, 3), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает рейтинг'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).rating is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_duplicate_review_rejected_by_constraint(self, admin_client,
+                                                        admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        from reviews.models import Title
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': [UNIQUE_REVIEW]}, (
+            'Проверьте, что повторный отзыв возвращает прежнюю ошибку'
+        )
+        assert not any(
+            'EXISTS' in query['sql'] or 'LIMIT 1' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что уникальность отзыва проверяет ограничение '
+            'базы, а не отдельный запрос перед вставкой'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (12, 3), (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_rating_after_author_deleted(self, admin_client, admin):
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        from reviews.models import Title
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (9, 2), (
+            'Проверьте, что удаление пользователя пересчитывает рейтинг '
+            'произведений, на которые он писал отзывы'
+        )
+        assert title.rating == 4.5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_rating_with_stale_review(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        from api.serializers import ReviewSerializer
+        from api.views import ReviewViewSet
+        from reviews.models import Review, Title
+
+        title = Title.objects.filter(pk=titles[0]['id'])
+
+        def assert_consistent(reason):
+            stored = title.values_list('rating_sum', 'review_count').get()
+            title.rebuild_rating()
+            assert stored == title.values_list(
+                'rating_sum', 'review_count').get(), (
+                f'Проверьте, что {reason} оставляет рейтинг согласованным '
+                'с отзывами'
+            )
+
+        review_id = Review.objects.filter(title=title.get()).first().pk
+        stale = Review.objects.get(pk=review_id)
+        # Параллельный запрос уже изменил оценку.
+        Review.objects.filter(pk=review_id).update(score=stale.score + 1)
+        title.change_rating(1, 0)
+        serializer = ReviewSerializer(stale, data={'score': 1}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        ReviewViewSet().perform_update(serializer)
+        assert_consistent('изменение устаревшего отзыва')
+
+        copies = [Review.objects.get(pk=review_id) for _ in range(2)]
+        for review in copies:
+            ReviewViewSet().perform_destroy(review)
+        assert_consistent('повторное удаление отзыва')
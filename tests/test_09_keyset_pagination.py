@@ -0,0 +1,65 @@
+import pytest
+
+from .common import create_reviews
+
+
+class Test09KeysetPagination:
+
+    def walk(self, client, url):
+        ids = []
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что постраничный вывод по курсору не считает записи'
+        )
+        while True:
+            ids.extend(item['id'] for item in data['results'])
+            if not data['next']:
+                return ids, data
+            data = client.get(data['next']).json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, admin_client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000) for i in range(25)
+        )
+        ids, last_page = self.walk(
+            admin_client, '/api/v1/titles/?pagination=cursor'
+        )
+        assert ids == list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        ), (
+            'Проверьте, что курсор по `id` обходит все произведения '
+            'по порядку и без повторов'
+        )
+        previous = admin_client.get(last_page['previous']).json()
+        assert [item['id'] for item in previous['results']] == ids[10:20], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу'
+        )
+        response = admin_client.get('/api/v1/titles/?cursor=garbage')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?pagination=cursor'
+        ids, _ = self.walk(admin_client, url)
+        expected = Review.objects.filter(
+            title=titles[0]['id']).order_by('-pub_date', '-id')
+        assert ids == list(expected.values_list('id', flat=True)), (
+            'Проверьте, что отзывы выводятся по курсору `(pub_date, id)`'
+        )
+        response = admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        )
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `pagination=cursor` '
+            'используется обычная пагинация'
+        )
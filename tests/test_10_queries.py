@@ -0,0 +1,128 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    return len(context.captured_queries)
+
+
+def create_catalog(size):
+    from reviews.models import Category, Genre, Title
+
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.get_or_create(name='Драма', slug='drama')[0],
+        Genre.objects.get_or_create(name='Комедия', slug='comedy')[0],
+    ]
+    for i in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+class Test10Queries:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?pagination=cursor',
+    ])
+    def test_01_titles_list_queries(self, client, url):
+        create_catalog(2)
+        small_page = count_queries(client, url)
+        create_catalog(8)
+        full_page = count_queries(client, url)
+        assert small_page == full_page <= 3, (
+            f'Проверьте, что GET запрос `{url}` загружает произведения, '
+            'их категории и жанры фиксированным числом запросов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_queries(self, client):
+        create_catalog(1)
+        from reviews.models import Title
+
+        title = Title.objects.get()
+        assert count_queries(client, f'/api/v1/titles/{title.id}/') <= 2, (
+            'Проверьте, что GET запрос `/api/v1/titles/{title_id}/` '
+            'загружает категорию и жанры без лишних запросов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('pagination', ['', '?pagination=cursor'])
+    def test_03_reviews_and_comments_queries(self, client, admin_client,
+                                             admin, pagination):
+        _, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/{pagination}'
+        comments_url = (
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{pagination}'
+        )
+        queries = {
+            url: count_queries(client, url)
+            for url in (reviews_url, comments_url)
+        }
+        from reviews.models import Comment, Review, Title
+
+        authors = [
+            get_user_model().objects.create_user(
+                username=f'author_{i}', email=f'author_{i}@yamdb.fake'
+            ) for i in range(5)
+        ]
+        Review.objects.bulk_create(
+            Review(title=Title.objects.get(pk=title_id), author=author,
+                   text='Отзыв', score=5) for author in authors
+        )
+        Comment.objects.bulk_create(
+            Comment(review_id=review_id, author=author, text='Комментарий')
+            for author in authors
+        )
+        for url, expected in queries.items():
+            assert count_queries(client, url) == expected <= 3, (
+                f'Проверьте, что GET запрос `{url}` загружает авторов '
+                'вместе с записями, фиксированным числом запросов'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_nested_parent_lookup(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        other_title_id = titles[1]['id']
+        comment_id = comments[0]['id']
+        mismatched = [
+            f'/api/v1/titles/{other_title_id}/reviews/{review_id}/',
+            f'/api/v1/titles/{other_title_id}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{other_title_id}/reviews/{review_id}/comments/'
+            f'{comment_id}/',
+        ]
+        for url in mismatched:
+            assert client.get(url).status_code == 404, (
+                f'Проверьте, что GET запрос `{url}` для отзыва другого '
+                'произведения возвращает статус 404'
+            )
+        response = admin_client.post(mismatched[1], data={'text': 'Текст'})
+        assert response.status_code == 404
+
+        detail_urls = [
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{comment_id}/',
+        ]
+        for url in detail_urls:
+            assert count_queries(client, url) == 1, (
+                f'Проверьте, что GET запрос `{url}` проверяет родителя '
+                'и загружает объект одним запросом'
+            )
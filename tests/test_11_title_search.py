@@ -0,0 +1,63 @@
+import pytest
+
+from .common import create_titles
+
+
+def search(client, query):
+    response = client.get(f'/api/v1/titles/?search={query}')
+    assert response.status_code == 200, (
+        'Проверьте, что при GET запросе `/api/v1/titles/?search=` '
+        'возвращается статус 200'
+    )
+    return [title['id'] for title in response.json()['results']]
+
+
+class Test11TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_fields(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert search(admin_client, 'поворот') == [titles[0]['id']], (
+            'Проверьте, что поиск находит произведение по названию'
+        )
+        assert search(admin_client, 'драма') == [titles[1]['id']], (
+            'Проверьте, что поиск находит произведение по жанру и описанию'
+        )
+        assert search(admin_client, 'Книги') == [titles[1]['id']], (
+            'Проверьте, что поиск находит произведение по категории'
+        )
+        assert search(admin_client, 'пик') == [titles[0]['id']], (
+            'Проверьте, что поиск находит слова по префиксу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_index_follows_writes(self, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'name': 'Разворот', 'genre': [genres[2]['slug']]}
+        )
+        assert search(admin_client, 'Поворот') == [], (
+            'Проверьте, что индекс обновляется при изменении произведения'
+        )
+        assert search(admin_client, 'Разворот') == [titles[0]['id']]
+        assert search(admin_client, 'Ужасы') == []
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert search(admin_client, 'Проект') == [], (
+            'Проверьте, что индекс обновляется при удалении произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_search_ranking(self, admin_client):
+        from reviews.models import Title
+
+        weak = Title.objects.create(
+            name='Ночь', year=2000,
+            description='Длинное описание, где один раз упомянут космос'
+        )
+        strong = Title.objects.create(
+            name='Космос', year=2000, description='Космос'
+        )
+        assert search(admin_client, 'космос') == [strong.id, weak.id], (
+            'Проверьте, что результаты поиска упорядочены по релевантности'
+        )
@@ -0,0 +1,69 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test12TitleFacets:
+
+    url = '/api/v1/titles/facets/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_facets_counts(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        response = client.get(self.url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{self.url}` '
+            'без токена возвращается статус 200'
+        )
+        data = response.json()
+        assert {row['slug']: row['count'] for row in data['genre']} == {
+            genres[0]['slug']: 1, genres[1]['slug']: 1, genres[2]['slug']: 1
+        }, 'Проверьте, что возвращается количество произведений по жанрам'
+        assert {row['slug']: row['count'] for row in data['category']} == {
+            categories[0]['slug']: 1, categories[1]['slug']: 1
+        }, 'Проверьте, что возвращается количество произведений по категориям'
+        assert data['year'] == [
+            {'from': 2000, 'to': 2009, 'count': 1},
+            {'from': 2020, 'to': 2029, 'count': 1},
+        ], 'Проверьте, что произведения группируются по десятилетиям'
+
+        response = client.get(
+            f'{self.url}?category={categories[0]["slug"]}&year_bucket=1'
+        )
+        data = response.json()
+        assert [row['slug'] for row in data['genre']] == sorted(
+            [genres[0]['slug'], genres[1]['slug']]
+        ), 'Проверьте, что фасеты учитывают фильтры `TitleFilter`'
+        assert data['year'] == [{'from': 2000, 'to': 2000, 'count': 1}]
+        response = client.get(f'{self.url}?year_bucket=0')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_facets_cache_invalidation(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert client.get(self.url).json()['year'][-1]['count'] == 1
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'year': 2021}
+        )
+        assert client.get(self.url).json()['year'] == [
+            {'from': 2020, 'to': 2029, 'count': 2}
+        ], (
+            'Проверьте, что кеш фасетов сбрасывается при изменении '
+            'произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_facets_with_search(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        response = client.get(f'{self.url}?search=Поворот')
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{self.url}` с `?search=` '
+            'возвращает статус 200'
+        )
+        data = response.json()
+        assert data['year'] == [{'from': 2000, 'to': 2009, 'count': 1}], (
+            'Проверьте, что фасеты учитывают полнотекстовый поиск'
+        )
+        assert [row['slug'] for row in data['category']] == [
+            categories[0]['slug']
+        ]
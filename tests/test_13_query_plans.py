@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+def query_plan(client, url, table):
+    '''
+    План выполнения основного запроса списка к таблице `table`.
+    '''
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if f'FROM "{table}"' in query['sql'] and 'COUNT(' not in query['sql']
+    ]
+    assert queries, f'Не найден запрос списка к таблице `{table}`'
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {queries[-1]}')
+        return ' | '.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is SQLite only'
+)
+class Test13QueryPlans:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('pagination', ['', 'pagination=cursor'])
+    def test_01_list_endpoints_use_indexes(self, admin_client, admin,
+                                           pagination):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        cases = [
+            (f'/api/v1/titles/{title_id}/reviews/', 'reviews_review',
+             'review_title_pub_date_idx'),
+            (f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+             'reviews_comment', 'comment_review_pub_date_idx'),
+            ('/api/v1/titles/?category=films&year=2000', 'reviews_title',
+             'title_category_year_idx'),
+        ]
+        for url, table, index in cases:
+            if pagination:
+                url += '&' if '?' in url else '?'
+                url += pagination
+            plan = query_plan(admin_client, url, table)
+            assert index in plan, (
+                f'Проверьте, что запрос списка `{url}` использует индекс '
+                f'`{index}`. План: {plan}'
+            )
+            assert 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что запрос списка `{url}` не сортирует '
+                f'во временном B-дереве. План: {plan}'
+            )
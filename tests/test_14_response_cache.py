@@ -0,0 +1,183 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_categories, create_comments, create_genre
+
+
+class Test14ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('url, create, data', [
+        ('/api/v1/categories/', create_categories,
+         {'name': 'Музыка', 'slug': 'music'}),
+        ('/api/v1/genres/', create_genre,
+         {'name': 'Мюзикл', 'slug': 'musical'}),
+    ])
+    def test_01_list_cache(self, client, admin_client, url, create, data):
+        created = create(admin_client)
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(context.captured_queries) == 0, (
+            f'Проверьте, что повторный GET запрос `{url}` '
+            'отдаётся из кеша без запросов к базе'
+        )
+        assert response.json()['count'] == len(created)
+
+        admin_client.post(url, data=data)
+        assert client.get(url).json()['count'] == len(created) + 1, (
+            f'Проверьте, что кеш `{url}` сбрасывается при создании объекта'
+        )
+        admin_client.delete(f'{url}{data["slug"]}/')
+        admin_client.delete(f'{url}{created[0]["slug"]}/')
+        assert client.get(url).json()['count'] == len(created) - 1, (
+            f'Проверьте, что кеш `{url}` сбрасывается при удалении объекта'
+        )
+        search = client.get(f'{url}?search={created[1]["name"]}').json()
+        assert search['count'] == 1, (
+            'Проверьте, что параметры запроса входят в ключ кеша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_conditional_get(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        urls = [
+            f'/api/v1/titles/{title_id}/',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        ]
+        etags = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.has_header('ETag'), (
+                f'Проверьте, что GET запрос `{url}` возвращает ETag'
+            )
+            etags[url] = response['ETag']
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 304, (
+                f'Проверьте, что GET запрос `{url}` с актуальным '
+                '`If-None-Match` возвращает статус 304'
+            )
+            assert len(context.captured_queries) == 0, (
+                'Проверьте, что ответ 304 отдаётся без запросов к базе'
+            )
+
+        admin_client.post(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            data={'text': 'Новый комментарий'}
+        )
+        changed = urls[-1]
+        response = client.get(changed, HTTP_IF_NONE_MATCH=etags[changed])
+        assert response.status_code == 200, (
+            f'Проверьте, что после нового комментария `{changed}` '
+            'возвращает статус 200'
+        )
+        response = client.get(urls[0], HTTP_IF_NONE_MATCH=etags[urls[0]])
+        assert response.status_code == 304
+
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            data={'score': 1}
+        )
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, (
+                f'Проверьте, что после изменения отзыва `{url}` '
+                'возвращает статус 200'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_writes_outside_api(self, client, admin_client, admin,
+                                   tmpdir):
+        from reviews.models import Review, Title
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        urls = [f'/api/v1/titles/{title_id}/', '/api/v1/titles/']
+
+        def etags():
+            return {url: client.get(url)['ETag'] for url in urls}
+
+        def assert_changed(etags, reason):
+            for url, etag in etags.items():
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                assert response.status_code == 200, (
+                    f'Проверьте, что после {reason} `{url}` возвращает '
+                    'статус 200'
+                )
+
+        before = etags()
+        title = Title.objects.get(pk=title_id)
+        title.name = 'Новое имя'
+        title.save()
+        assert_changed(before, 'изменения произведения через ORM')
+
+        before = etags()
+        Review.objects.filter(pk=reviews[0]['id']).update(score=1)
+        call_command('rebuild_ratings')
+        assert_changed(before, 'пересчёта рейтингов')
+
+        review_id = reviews[0]['id']
+        comments = f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        etag = client.get(comments)['ETag']
+        source = tmpdir.join('comments.csv')
+        source.write(
+            'id,review_id,text,author_id,pub_date\n'
+            f'100,{review_id},Комментарий,{admin.id},2020-01-01T00:00:00Z\n'
+        )
+        call_command('load_comments', str(source))
+        assert_changed({comments: etag}, 'загрузки комментариев из CSV')
+        from api.cache import get_cache
+        assert get_cache().get('version:reviews.comment:100') is None, (
+            'Проверьте, что загрузка не заводит версии объектов, которые '
+            'не входят в ETag'
+        )
+
+        url = '/api/v1/categories/'
+        count = client.get(url).json()['count']
+        source = tmpdir.join('category.csv')
+        source.write('id,name,slug\n100,Музыка,music\n')
+        call_command('load_categories', str(source))
+        assert client.get(url).json()['count'] == count + 1, (
+            f'Проверьте, что кеш `{url}` сбрасывается после загрузки CSV'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('backend, single_process', [
+        ('django.core.cache.backends.dummy.DummyCache', True),
+        ('django.core.cache.backends.locmem.LocMemCache', False),
+    ])
+    def test_04_versions_not_shared(self, client, admin_client, admin,
+                                    settings, backend, single_process):
+        settings.CACHES = {**settings.CACHES, 'versions': {
+            'BACKEND': backend, 'LOCATION': 'versions'
+        }}
+        settings.API_CACHE_ALIAS = 'versions'
+        settings.API_CACHE_SINGLE_PROCESS = single_process
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        assert not response.has_header('ETag'), (
+            'Проверьте, что без общих для процессов счётчиков версий '
+            'ETag не выдаётся'
+        )
+        etag = '"{}"'.format('0' * 40)
+        admin_client.patch(url, data={'name': 'Новое имя'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Новое имя'
+
+        categories = '/api/v1/categories/'
+        count = client.get(categories).json()['count']
+        admin_client.post(categories, data={'name': 'Музыка',
+                                            'slug': 'music'})
+        assert client.get(categories).json()['count'] == count + 1, (
+            'Проверьте, что без общих счётчиков версий список '
+            'не отдаётся из кеша'
+        )
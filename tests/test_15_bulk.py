@@ -0,0 +1,178 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_reviews, create_titles
+
+
+class Test15Bulk:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_bulk(self, admin_client, admin, user, moderator):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk/'
+        data = [
+            {'text': 'Отзыв администратора', 'score': 10},
+            {'text': 'Отзыв пользователя', 'score': 6,
+             'author': user.username},
+            {'text': 'Повтор', 'score': 1, 'author': user.username},
+            {'text': 'Неверная оценка', 'score': 11,
+             'author': moderator.username},
+            {'text': 'Неизвестный автор', 'score': 5, 'author': 'nobody'},
+        ]
+        response = auth_client(user).post(url, data=data, format='json')
+        assert response.status_code == 403, (
+            f'Проверьте, что POST запрос `{url}` доступен только '
+            'администратору'
+        )
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 207, (
+            f'Проверьте, что POST запрос `{url}` с частично неверными '
+            'данными возвращает статус 207'
+        )
+        results = response.json()
+        assert [item['status'] for item in results] == [
+            201, 201, 400, 400, 400
+        ], 'Проверьте, что результат возвращается для каждого элемента'
+        assert 'author' in results[4]['errors']
+        assert 'score' in results[3]['errors']
+        assert results[1]['data']['author'] == user.username
+
+        from reviews.models import Review, Title
+
+        for item in results[:2]:
+            review = Review.objects.get(pk=item['data']['id'])
+            assert review.text == item['data']['text'], (
+                'Проверьте, что в ответе возвращаются id созданных отзывов'
+            )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating, title.review_count) == (8, 2), (
+            'Проверьте, что массовое создание отзывов обновляет рейтинг'
+        )
+        response = admin_client.post(url, data=data[:1], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв в массовом запросе отклоняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_bulk(self, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/bulk/'
+        )
+        data = [
+            {'text': f'Комментарий {i}', 'author': user.username}
+            for i in range(3)
+        ]
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{url}` с верными данными '
+            'возвращает статус 201'
+        )
+        from reviews.models import Comment
+
+        for item, sent in zip(response.json(), data):
+            comment = Comment.objects.get(pk=item['data']['id'])
+            assert (comment.text, comment.author) == (sent['text'], user)
+        response = admin_client.post(url, data={'text': 'Один'},
+                                     format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что массовый запрос принимает только список'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_titles_bulk(self, admin_client, user_client):
+        _, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/bulk/'
+
+        def payload(size):
+            return [
+                {'name': f'Произведение {i}', 'year': 1990 + i,
+                 'category': categories[i % 2]['slug'],
+                 'genre': [genres[0]['slug'], genres[i % 3]['slug']]}
+                for i in range(size)
+            ]
+
+        assert user_client.post(
+            url, data=payload(1), format='json'
+        ).status_code == 403, (
+            f'Проверьте, что POST запрос `{url}` доступен только '
+            'администратору'
+        )
+        with CaptureQueriesContext(connection) as small:
+            response = admin_client.post(url, data=payload(3), format='json')
+        assert response.status_code == 200, (
+            f'Проверьте, что POST запрос `{url}` с верными данными '
+            'возвращает статус 200'
+        )
+        with CaptureQueriesContext(connection) as large:
+            admin_client.post(url, data=payload(30), format='json')
+        assert len(small.captured_queries) == len(large.captured_queries), (
+            'Проверьте, что число запросов массовой загрузки не зависит '
+            'от количества произведений'
+        )
+
+        created = response.json()
+        title_id = created[1]['data']['id']
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        data = response.json()
+        assert data['name'] == 'Произведение 1'
+        assert data['category']['slug'] == categories[1]['slug']
+        assert sorted(genre['slug'] for genre in data['genre']) == sorted(
+            [genres[0]['slug'], genres[1]['slug']]
+        ), 'Проверьте, что массовая загрузка записывает жанры произведений'
+
+        response = admin_client.post(url, data=[
+            {'id': title_id, 'name': 'Новое имя', 'genre': [genres[2]['slug']]},
+            {'id': 10 ** 6, 'name': 'Нет такого'},
+            {'name': 'Без жанра', 'year': 2000, 'genre': ['unknown']},
+        ], format='json')
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == [200, 400, 400]
+        data = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert data['name'] == 'Новое имя'
+        assert data['year'] == 1991
+        assert [genre['slug'] for genre in data['genre']] == [
+            genres[2]['slug']
+        ], 'Проверьте, что массовое изменение заменяет жанры произведения'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_titles_bulk_duplicate_id(self, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        url = '/api/v1/titles/bulk/'
+        title_id = titles[0]['id']
+        response = admin_client.post(url, data=[
+            {'id': title_id, 'name': 'Первое имя',
+             'genre': [genres[0]['slug']]},
+            {'id': title_id, 'name': 'Второе имя',
+             'genre': [genres[0]['slug']]},
+        ], format='json')
+        assert response.status_code == 207, (
+            f'Проверьте, что POST запрос `{url}` с повторным `id` '
+            'возвращает статус 207, а не ошибку сервера'
+        )
+        results = response.json()
+        assert [item['status'] for item in results] == [200, 400]
+        assert 'id' in results[1]['errors'], (
+            'Проверьте, что повтор `id` в запросе — ошибка элемента'
+        )
+        data = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert data['name'] == 'Первое имя'
+        assert [genre['slug'] for genre in data['genre']] == [
+            genres[0]['slug']
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_bulk_pks_only_on_sqlite(self, monkeypatch):
+        from api.mixins import assign_bulk_pks
+        from reviews.models import Genre
+
+        genres = [Genre(name='Джаз', slug='jazz')]
+        Genre.objects.bulk_create(genres)
+        monkeypatch.setattr(connection, 'vendor', 'mysql')
+        with pytest.raises(NotImplementedError):
+            assign_bulk_pks(Genre, genres)
+        monkeypatch.undo()
+        assign_bulk_pks(Genre, genres)
+        assert genres[0].pk == Genre.objects.get(slug='jazz').pk
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    return response.json(), ' '.join(
+        query['sql'] for query in context.captured_queries
+    )
+
+
+class Test16SparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_fields(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        data, sql = get_with_queries(client, '/api/v1/titles/?fields=id,name')
+        assert set(data['results'][0]) == {'id', 'name'}, (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'перечисленные поля произведения'
+        )
+        for fragment in ('reviews_category', 'reviews_genre', '"rating"',
+                         '"description"'):
+            assert fragment not in sql, (
+                'Проверьте, что `?fields=` не загружает из базы столбцы '
+                f'и связи, которых нет в ответе: найдено {fragment}'
+            )
+
+        data, sql = get_with_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/?fields=genre,rating'
+        )
+        assert set(data) == {'genre', 'rating'}
+        assert data['rating'] == 4
+        assert 'reviews_genre' in sql and 'reviews_category' not in sql
+
+        response = client.get('/api/v1/titles/?fields=id,unknown')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `?fields=` '
+            'возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_users_fields(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, sql = get_with_queries(client, f'{url}?fields=id,score')
+        assert set(data['results'][0]) == {'id', 'score'}
+        assert 'users_user' not in sql and '"text"' not in sql, (
+            'Проверьте, что без поля `author` отзывы загружаются '
+            'без соединения с таблицей пользователей'
+        )
+        data, sql = get_with_queries(client, f'{url}?fields=author')
+        assert {item['author'] for item in data['results']} == {
+            review['author'] for review in reviews
+        }
+        assert '"email"' not in sql
+
+        data, sql = get_with_queries(
+            admin_client, '/api/v1/users/?fields=username,role'
+        )
+        assert set(data['results'][0]) == {'username', 'role'}
+        list_sql = sql.rsplit('SELECT', 1)[-1]
+        assert '"bio"' not in list_sql, (
+            'Проверьте, что `?fields=` не загружает лишние столбцы '
+            'пользователя'
+        )
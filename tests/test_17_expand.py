@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    return response.json(), len(context.captured_queries)
+
+
+class Test17Expand:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_expand_reviews(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?expand=reviews'
+        )
+        title = next(
+            item for item in data['results'] if item['id'] == titles[0]['id']
+        )
+        assert {review['id'] for review in title['reviews']} == {
+            review['id'] for review in reviews
+        }, (
+            'Проверьте, что `?expand=reviews` встраивает отзывы '
+            'в ответ произведения'
+        )
+        assert 'comments' not in title['reviews'][0]
+        assert queries <= 4, (
+            'Проверьте, что `?expand=reviews` загружает отзывы '
+            'и их авторов одним запросом на все произведения'
+        )
+
+        data, queries = get_with_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/'
+            '?expand=reviews.comments'
+        )
+        embedded = [
+            comment['id']
+            for review in data['reviews'] for comment in review['comments']
+        ]
+        assert sorted(embedded) == sorted(
+            comment['id'] for comment in comments
+        ), (
+            'Проверьте, что `?expand=reviews.comments` встраивает '
+            'комментарии в отзывы'
+        )
+        assert queries <= 4
+
+        data, _ = get_with_queries(client, '/api/v1/titles/')
+        assert 'reviews' not in data['results'][0]
+        response = client.get('/api/v1/titles/?expand=genre')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестная связь в `?expand=` '
+            'возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_expand_limits(self, client, admin_client, admin,
+                              monkeypatch):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        from api.views import TitleViewSet
+
+        monkeypatch.setattr(TitleViewSet, 'expand_reviews_limit', 1)
+        monkeypatch.setattr(TitleViewSet, 'expand_comments_limit', 1)
+        data, _ = get_with_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/'
+            '?expand=reviews.comments'
+        )
+        assert len(data['reviews']) == 1, (
+            'Проверьте, что встраивается не больше '
+            '`expand_reviews_limit` отзывов'
+        )
+        assert data['reviews'][0]['id'] == reviews[-1]['id'], (
+            'Проверьте, что встраиваются самые новые отзывы'
+        )
+        assert data['reviews'][0]['comments'] == []
+
+        monkeypatch.setattr(TitleViewSet, 'expand_reviews_limit', 3)
+        data, _ = get_with_queries(
+            client, '/api/v1/titles/?expand=reviews.comments'
+        )
+        title = next(
+            item for item in data['results'] if item['id'] == titles[0]['id']
+        )
+        commented = title['reviews'][-1]
+        assert commented['id'] == reviews[0]['id']
+        assert len(commented['comments']) == 1, (
+            'Проверьте, что встраивается не больше '
+            '`expand_comments_limit` комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_expand_etag(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/?expand=reviews.comments'
+        etag = client.get(url)['ETag']
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}'
+            '/comments/',
+            data={'text': 'Новый комментарий'}
+        )
+        assert response.status_code == 201
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет ETag произведения '
+            'со встроенными комментариями'
+        )
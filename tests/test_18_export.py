@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+def read_stream(response):
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся через `StreamingHttpResponse`'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+class Test18Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_ndjson(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        response = admin_client.get('/api/v1/export/titles/?format=ndjson')
+        assert response.status_code == 200, (
+            'Проверьте, что администратор может выгрузить произведения'
+        )
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in read_stream(response).splitlines()]
+        assert [row['id'] for row in rows] == sorted(
+            title['id'] for title in titles
+        )
+        first = rows[0]
+        assert first['rating'] == 4 and first['genre'] and first['category']
+
+        for name, expected in (('reviews', reviews), ('comments', comments)):
+            response = admin_client.get(f'/api/v1/export/{name}/')
+            lines = read_stream(response).splitlines()
+            assert {json.loads(line)['id'] for line in lines} == {
+                item['id'] for item in expected
+            }, f'Проверьте выгрузку `/api/v1/export/{name}/`'
+
+        for other in (client, auth_client(user)):
+            response = other.get('/api/v1/export/titles/')
+            assert response.status_code in (401, 403), (
+                'Проверьте, что выгрузка доступна только администратору'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_csv_in_batches(self, admin_client, admin,
+                                      monkeypatch):
+        _, reviews, _, _, _ = create_comments(admin_client, admin)
+        from api.views import ExportViewSet
+
+        monkeypatch.setattr(ExportViewSet, 'export_batch_size', 2)
+        response = admin_client.get('/api/v1/export/reviews/?format=csv')
+        assert response['Content-Type'].startswith('text/csv')
+        with CaptureQueriesContext(connection) as context:
+            content = read_stream(response)
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert [int(row['id']) for row in rows] == sorted(
+            review['id'] for review in reviews
+        ), 'Проверьте, что CSV содержит все отзывы'
+        assert rows[0]['author'] == admin.username
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что выгрузка читает записи пачками '
+            'по `export_batch_size`'
+        )
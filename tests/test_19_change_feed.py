@@ -0,0 +1,96 @@
+import pytest
+
+from .common import auth_client, create_comments
+
+
+def read_feed(client, url='/api/v1/changes/'):
+    entries = []
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            'Проверьте, что администратору доступна лента изменений '
+            '`/api/v1/changes/`'
+        )
+        data = response.json()
+        entries += data['results']
+        url = data['next']
+        if not data['has_more']:
+            return entries, url
+
+
+def changes(entries):
+    return {(entry['model'], entry['object_id'], entry['action'])
+            for entry in entries}
+
+
+class Test19ChangeFeed:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_change_feed(self, client, admin_client, admin, monkeypatch):
+        from api.pagination import ChangeFeedPagination
+
+        monkeypatch.setattr(ChangeFeedPagination, 'page_size', 5)
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        entries, cursor = read_feed(admin_client)
+        assert [entry['id'] for entry in entries] == sorted(
+            entry['id'] for entry in entries
+        ), 'Проверьте, что лента отдаёт изменения по порядку'
+        expected = {('title', title['id'], 'create') for title in titles}
+        expected |= {('review', review['id'], 'create') for review in reviews}
+        expected |= {
+            ('comment', comment['id'], 'create') for comment in comments
+        }
+        expected.add(('title', titles[0]['id'], 'update'))
+        assert expected <= changes(entries), (
+            'Проверьте, что в ленту попадают созданные объекты и изменение '
+            'рейтинга произведения'
+        )
+
+        empty, same = read_feed(admin_client, cursor)
+        assert empty == [] and same == cursor, (
+            'Проверьте, что без новых изменений лента пуста и возвращает '
+            'тот же курсор'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        entries, _ = read_feed(admin_client, cursor)
+        expected = {('title', titles[0]['id'], 'delete')}
+        expected |= {('review', review['id'], 'delete') for review in reviews}
+        expected |= {
+            ('comment', comment['id'], 'delete') for comment in comments
+        }
+        assert changes(entries) == expected, (
+            'Проверьте, что удаление произведения попадает в ленту вместе '
+            'с удалёнными отзывами и комментариями'
+        )
+
+        for other in (client, auth_client(user)):
+            response = other.get('/api/v1/changes/')
+            assert response.status_code in (401, 403), (
+                'Проверьте, что лента изменений доступна только администратору'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_change_feed_bulk_and_relations(self, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        _, cursor = read_feed(admin_client)
+
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': 'Новое', 'year': 2000, 'category': 'films',
+             'genre': ['drama']},
+        ], format='json')
+        assert response.status_code == 200
+        entries, cursor = read_feed(admin_client, cursor)
+        created = response.json()[0]['data']['id']
+        assert ('title', created, 'create') in changes(entries), (
+            'Проверьте, что массовое создание произведений попадает в ленту'
+        )
+
+        admin_client.delete('/api/v1/genres/drama/')
+        entries, _ = read_feed(admin_client, cursor)
+        assert ('title', created, 'update') in changes(entries), (
+            'Проверьте, что удаление жанра отмечает изменение его '
+            'произведений'
+        )
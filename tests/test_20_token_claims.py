@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def claims_client(user):
+    from api.serializers import GetTokenSerializer
+
+    token = GetTokenSerializer.get_token(user).access_token
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client, token
+
+
+class Test20TokenClaims:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_claims_in_token(self, admin):
+        _, token = claims_client(admin)
+        assert (token['username'], token['role'], token['is_superuser']) == (
+            admin.username, admin.role, admin.is_superuser
+        ), 'Проверьте, что токен содержит `username`, `role` и `is_superuser`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_no_user_lookup(self, admin, user):
+        client, _ = claims_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/changes/')
+        assert response.status_code == 200
+        assert not any('users_user' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что при актуальных claims пользователь '
+            'не загружается из базы'
+        )
+
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == admin.email, (
+            'Проверьте, что `users/me/` отдаёт все поля пользователя'
+        )
+
+        from reviews.models import Title
+        title = Title.objects.create(name='Произведение', year=2000)
+        user_client, _ = claims_client(user)
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_role_change_revokes_claims(self, admin_client, user,
+                                           django_user_model):
+        demoted = django_user_model.objects.create_user(
+            username='Demoted', email='demoted@yamdb.fake', role='admin'
+        )
+        client, _ = claims_client(demoted)
+        assert client.get('/api/v1/changes/').status_code == 200
+        response = admin_client.patch(
+            f'/api/v1/users/{demoted.username}/', data={'role': 'user'}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/v1/changes/').status_code == 403, (
+            'Проверьте, что после смены роли старые claims токена '
+            'не действуют'
+        )
+
+        deleted_client, _ = claims_client(user)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = deleted_client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что токен удалённого пользователя не действует'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_process_local_cache(self, admin, settings):
+        settings.API_CACHE_SINGLE_PROCESS = False
+        client, _ = claims_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/changes/')
+        assert response.status_code == 200
+        assert any('users_user' in query['sql']
+                   for query in context.captured_queries), (
+            'Проверьте, что при кеше одного процесса claims токена '
+            'не заменяют чтение пользователя из базы'
+        )
@@ -0,0 +1,47 @@
+import pytest
+from django.contrib.auth.hashers import make_password
+
+
+class Test21ConfirmationCode:
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_code_single_use(self, client, user):
+        code = user.make_confirmation_code()
+        user.set_confirmation_code(code)
+        user.save()
+        assert code not in user.confirmation_code
+        assert user.confirmation_code.startswith('hmac$'), (
+            'Проверьте, что код подтверждения хранится как HMAC'
+        )
+
+        data = {'username': user.username, 'confirmation_code': code}
+        response = client.post(self.url_token, data=data)
+        assert response.status_code == 200 and 'access' in response.json(), (
+            'Проверьте, что по верному коду выдаётся токен'
+        )
+        response = client.post(self.url_token, data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения можно использовать один раз'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_code_expiry_and_legacy(self, client, user, settings):
+        code = user.make_confirmation_code()
+        user.set_confirmation_code(code)
+        user.save()
+        data = {'username': user.username, 'confirmation_code': code}
+        settings.CONFIRMATION_CODE_TIMEOUT = -1
+        response = client.post(self.url_token, data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что просроченный код подтверждения не принимается'
+        )
+
+        settings.CONFIRMATION_CODE_TIMEOUT = 60
+        user.confirmation_code = make_password(code)
+        user.save()
+        response = client.post(self.url_token, data=data)
+        assert response.status_code == 200, (
+            'Проверьте, что коды, выданные до перехода на HMAC, '
+            'по-прежнему принимаются'
+        )
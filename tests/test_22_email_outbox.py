@@ -0,0 +1,144 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class CountingBackend(EmailBackend):
+    '''
+    Как SMTP-бэкенд, считает новые соединения: повторный `open`
+    при открытом соединении ничего не делает.
+    '''
+
+    opened = 0
+    connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return False
+        CountingBackend.opened += 1
+        self.connection = object()
+        return True
+
+    def close(self):
+        self.connection = None
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class SecondFailsBackend(EmailBackend):
+    '''
+    Команда падает на втором письме: исключение не из `Exception`
+    не перехватывается как ошибка отправки.
+    '''
+
+    sent = 0
+
+    def send_messages(self, messages):
+        SecondFailsBackend.sent += 1
+        if SecondFailsBackend.sent == 2:
+            raise KeyboardInterrupt
+        return super().send_messages(messages)
+
+
+class Test22EmailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_email(self, client, settings):
+        from users.models import OutboxEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_22_email_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        for i in range(3):
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'
+            })
+            assert response.status_code == 200
+        assert mail.outbox == [] and OutboxEmail.objects.count() == 3, (
+            'Проверьте, что регистрация ставит письмо в очередь '
+            'и не отправляет его сама'
+        )
+
+        call_command('send_outbox', batch_size=2)
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{i}@yamdb.fake' for i in range(3)
+        ], 'Проверьте, что `send_outbox` отправляет письма из очереди'
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что `send_outbox` отправляет все письма через '
+            'одно соединение'
+        )
+        assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+        call_command('send_outbox')
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что отправленные письма не отправляются повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_with_backoff(self, client, settings):
+        from users.models import OutboxEmail
+
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'retry', 'email': 'retry@yamdb.fake'
+        })
+        settings.EMAIL_BACKEND = 'tests.test_22_email_outbox.FailingBackend'
+        call_command('send_outbox', backoff=0, max_attempts=3)
+        email = OutboxEmail.objects.get()
+        assert (email.attempts, email.sent_at) == (3, None), (
+            'Проверьте, что неудачная отправка повторяется не больше '
+            '`--max-attempts` раз'
+        )
+        assert 'SMTP' in email.last_error
+
+        email.attempts = 0
+        email.save()
+        call_command('send_outbox', backoff=60)
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что после неудачи следующая попытка откладывается'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        email.next_attempt_at = email.created
+        email.save()
+        call_command('send_outbox')
+        assert [message.to for message in mail.outbox] == [
+            ['retry@yamdb.fake']
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_claimed_batches(self, client, settings):
+        from datetime import timedelta
+
+        from users.models import OutboxEmail
+
+        for i in range(3):
+            client.post('/api/v1/auth/signup/', data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'
+            })
+        lease = timedelta(minutes=5)
+        claimed = OutboxEmail.objects.claim(5, 2, lease)
+        assert len(claimed) == 2
+        assert OutboxEmail.objects.claim(5, 2, lease) == [
+            OutboxEmail.objects.exclude(
+                pk__in=[email.pk for email in claimed]).get()
+        ], (
+            'Проверьте, что письма, взятые в отправку, не достаются '
+            'другому отправителю до истечения срока'
+        )
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        settings.EMAIL_BACKEND = (
+            'tests.test_22_email_outbox.SecondFailsBackend'
+        )
+        SecondFailsBackend.sent = 0
+        with pytest.raises(KeyboardInterrupt):
+            call_command('send_outbox')
+        assert OutboxEmail.objects.filter(
+            sent_at__isnull=False).count() == 1, (
+            'Проверьте, что письмо отмечается отправленным сразу после '
+            'отправки, а не в конце пачки'
+        )
@@ -0,0 +1,90 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .common import auth_client
+
+
+class Test23Throttling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_and_token(self, client, monkeypatch):
+        from api.throttling import (SignupThrottle, TokenThrottle,
+                                    TokenUsernameThrottle)
+
+        monkeypatch.setattr(SignupThrottle, 'rate', '2/min', raising=False)
+        codes = [
+            client.post('/api/v1/auth/signup/', data={
+                'username': f'user{i}', 'email': f'user{i}@yamdb.fake'
+            }).status_code
+            for i in range(3)
+        ]
+        assert codes == [200, 200, 429], (
+            'Проверьте, что регистрация ограничена по IP-адресу'
+        )
+
+        monkeypatch.setattr(TokenThrottle, 'rate', '100/min',
+                            raising=False)
+        monkeypatch.setattr(TokenUsernameThrottle, 'rate', '2/min',
+                            raising=False)
+        data = {'username': 'user0', 'confirmation_code': 'wrong'}
+        codes = [
+            client.post('/api/v1/auth/token/', data=data,
+                        REMOTE_ADDR=f'10.0.0.{i}').status_code
+            for i in range(3)
+        ]
+        assert codes == [400, 400, 429], (
+            'Проверьте, что попытки получить токен ограничены по username '
+            'независимо от IP-адреса'
+        )
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'user1', 'confirmation_code': 'wrong'
+        })
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_post_per_user(self, admin_client, user, moderator,
+                                     monkeypatch):
+        from api.throttling import ReviewPostThrottle
+        from reviews.models import Title
+
+        monkeypatch.setattr(ReviewPostThrottle, 'rate', '1/min',
+                            raising=False)
+        titles = [Title.objects.create(name=f'Произведение {i}', year=2000)
+                  for i in range(2)]
+        user_client = auth_client(user)
+        url = '/api/v1/titles/{}/reviews/'
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(
+            url.format(titles[0].id), data=data).status_code == 201
+        assert user_client.post(
+            url.format(titles[1].id), data=data).status_code == 429, (
+            'Проверьте, что создание отзывов ограничено для пользователя'
+        )
+        assert user_client.get(url.format(titles[1].id)).status_code == 200, (
+            'Проверьте, что лимит не действует на чтение'
+        )
+        assert auth_client(moderator).post(
+            url.format(titles[1].id), data=data).status_code == 201, (
+            'Проверьте, что лимит считается отдельно для каждого пользователя'
+        )
+
+    def test_03_sliding_window(self, monkeypatch):
+        from api.throttling import SignupThrottle
+
+        monkeypatch.setattr(SignupThrottle, 'rate', '10/min', raising=False)
+        request = Request(APIRequestFactory().post('/'))
+        now = [50.0]
+        monkeypatch.setattr(SignupThrottle, 'timer', lambda self: now[0])
+        throttle = SignupThrottle()
+        assert all(throttle.allow_request(request, None) for _ in range(10))
+        assert not throttle.allow_request(request, None)
+
+        now[0] = 70.0
+        assert throttle.allow_request(request, None), (
+            'Проверьте, что вес прошлого окна уменьшается со временем'
+        )
+        assert not throttle.allow_request(request, None), (
+            'Проверьте, что запросы прошлого окна учитываются в новом'
+        )
+        assert 0 < throttle.wait() <= 60
@@ -0,0 +1,58 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def user_selects(context):
+    return [query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'users_user' in query['sql']]
+
+
+class Test24TokenLookup:
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_single_lookup(self, client, user):
+        code = user.make_confirmation_code()
+        user.set_confirmation_code(code)
+        user.save()
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_token, data={
+                'username': user.username, 'confirmation_code': code
+            })
+        assert response.status_code == 200
+        assert len(user_selects(context)) == 1, (
+            'Проверьте, что при обмене кода на токен пользователь '
+            'загружается из базы один раз'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_unknown_username_cached(self, client):
+        data = {'username': 'newcomer', 'confirmation_code': 'code'}
+        assert client.post(self.url_token, data=data).status_code == 404
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_token, data=data)
+        assert response.status_code == 404
+        assert user_selects(context) == [], (
+            'Проверьте, что повторный запрос с неизвестным username '
+            'не обращается к базе'
+        )
+
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        assert client.post(self.url_token, data=data).status_code == 400, (
+            'Проверьте, что после регистрации username больше не считается '
+            'неизвестным'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_benchmark_command(self, capsys):
+        call_command('benchmark_token', requests=3)
+        output = capsys.readouterr().out
+        assert 'tokens/sec' in output
+        from django.contrib.auth import get_user_model
+        assert not get_user_model().objects.filter(
+            username='benchmark_token').exists()
@@ -0,0 +1,62 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Test25SignupValidation:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_single_uniqueness_query(self, client, user):
+        data = {'username': 'fresh', 'email': 'fresh@yamdb.fake'}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        selects = [query for query in context.captured_queries
+                   if query['sql'].startswith('SELECT')]
+        assert len(selects) == 1, (
+            'Проверьте, что занятость username и email при регистрации '
+            'проверяется одним запросом'
+        )
+
+        response = client.post(self.url_signup, data={
+            'username': user.username, 'email': user.email
+        })
+        assert response.status_code == 400
+        assert set(response.json()) == {'username', 'email'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_concurrent_signup(self, client, user, monkeypatch):
+        from api.serializers import UserRegistrationSerializer
+
+        get_conflicts = UserRegistrationSerializer.get_conflicts
+        calls = []
+
+        def conflicts_after_check(self, values):
+            # Первая проверка не видит пользователя, созданного
+            # параллельным запросом.
+            calls.append(values)
+            return get_conflicts(self, values) if len(calls) > 1 else {}
+
+        monkeypatch.setattr(UserRegistrationSerializer, 'get_conflicts',
+                            conflicts_after_check)
+        response = client.post(self.url_signup, data={
+            'username': user.username, 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что нарушение уникальности в базе возвращает '
+            'статус 400'
+        )
+        assert list(response.json()) == ['username']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_non_dict_body(self, client):
+        for body in ('[1, 2]', '"username"'):
+            response = client.post(
+                self.url_signup, data=body, content_type='application/json'
+            )
+            assert response.status_code == 400, (
+                f'Проверьте, что POST запрос `{self.url_signup}` не словарём '
+                'возвращает статус 400'
+            )
+            assert 'non_field_errors' in response.json()
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+from django.core.management import call_command
+
+from .conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+COMMANDS = (
+    ('load_users', 'users.csv'),
+    ('load_categories', 'category.csv'),
+    ('load_genres', 'genre.csv'),
+    ('load_titles', 'titles.csv'),
+    ('load_genre_title', 'genre_title.csv'),
+    ('load_reviews', 'review.csv'),
+    ('load_comments', 'comments.csv'),
+)
+
+
+def count_rows(name):
+    import csv
+
+    with open(os.path.join(DATA_DIR, name), encoding='utf-8',
+              newline='') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+class Test26CSVLoad:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_local_files_in_batches(self, capsys):
+        for command, name in COMMANDS:
+            call_command(command, os.path.join(DATA_DIR, name), batch_size=5)
+        output = capsys.readouterr().out
+        assert 'rows/sec' in output, (
+            'Проверьте, что загрузка сообщает скорость в строках в секунду'
+        )
+
+        from reviews.models import Comment, Review, Title
+        assert Title.objects.count() == count_rows('titles.csv')
+        assert Title.genre.through.objects.count() == count_rows(
+            'genre_title.csv'
+        ), 'Проверьте, что `load_genre_title` загружает связи жанров'
+        assert Review.objects.count() == count_rows('review.csv'), (
+            'Проверьте, что многострочные значения CSV читаются целиком'
+        )
+        assert Comment.objects.count() == count_rows('comments.csv')
+        assert '\n' in Review.objects.get(pk=1).text
+        assert not Title.objects.filter(
+            reviews__isnull=False, rating__isnull=True).exists(), (
+            'Проверьте, что после загрузки отзывов пересчитывается рейтинг'
+        )
+
+        from reviews.models import ChangeLog
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.isoformat().startswith('2019-09-24T21:08'), (
+            'Проверьте, что загрузка сохраняет дату публикации из файла'
+        )
+        assert ChangeLog.objects.filter(
+            model='review', action=ChangeLog.CREATE
+        ).count() == count_rows('review.csv'), (
+            'Проверьте, что загруженные объекты попадают в журнал изменений'
+        )
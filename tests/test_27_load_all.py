@@ -0,0 +1,67 @@
+import os
+
+import pytest
+from django.core.management import call_command
+
+from .conftest import MANAGE_PATH
+from .test_26_csv_load import count_rows
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+class Test27LoadAll:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_dataset(self, capsys):
+        call_command('load_all', DATA_DIR, workers=2, batch_size=10)
+        output = capsys.readouterr().out
+        for stage in ('parse', 'users.csv', 'genre_title.csv', 'ratings'):
+            assert f'{stage}:' in output, (
+                f'Проверьте, что `load_all` сообщает время этапа {stage}'
+            )
+
+        from reviews.models import Comment, Review, Title
+        from users.models import User
+        assert User.objects.count() == count_rows('users.csv')
+        assert Title.genre.through.objects.count() == count_rows(
+            'genre_title.csv'
+        )
+        assert Review.objects.count() == count_rows('review.csv')
+        assert Comment.objects.count() == count_rows('comments.csv')
+        assert not Title.objects.filter(
+            reviews__isnull=False, rating__isnull=True).exists()
+        assert Comment.objects.get(pk=1).pub_date.year == 2020, (
+            'Проверьте, что `load_all` сохраняет дату публикации из файла'
+        )
+
+        from reviews.models import ChangeLog
+        assert ChangeLog.objects.filter(
+            model='comment', action=ChangeLog.CREATE
+        ).count() == count_rows('comments.csv'), (
+            'Проверьте, что `load_all` пишет загруженные объекты в журнал '
+            'изменений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_unknown_foreign_keys(self, tmpdir, user):
+        tmpdir.join('category.csv').write('id,name,slug\n1,Фильм,movie\n')
+        tmpdir.join('titles.csv').write(
+            'id,name,year,category_id\n1,Первое,2000,1\n2,Второе,2001,7\n'
+        )
+        tmpdir.join('review.csv').write(
+            'id,title_id,text,author_id,score,pub_date\n'
+            f'1,1,Отзыв,{user.id},8,2020-01-01T00:00:00Z\n'
+            '2,1,Отзыв,999,2,2020-01-01T00:00:00Z\n'
+            f'3,5,Отзыв,{user.id},2,2020-01-01T00:00:00Z\n'
+        )
+        call_command('load_all', str(tmpdir), workers=0)
+
+        from reviews.models import Review, Title
+        assert list(Review.objects.values_list('id', flat=True)) == [1], (
+            'Проверьте, что отзывы с неизвестным автором или произведением '
+            'пропускаются'
+        )
+        assert Title.objects.get(pk=2).category is None, (
+            'Проверьте, что неизвестная необязательная категория обнуляется'
+        )
+        assert Title.objects.get(pk=1).rating == 8